@@ -1,6 +1,6 @@
 {
     "name": "Orders Management with ShipStation Integration",
-    "version": "16.0.1.0.0",
+    "version": "16.0.1.5.0",
     "category": "Inventory",
     "summary": "Inventory design order management with ShipStation integration",
     "description": """
@@ -19,10 +19,12 @@
         "security/inventory_security.xml",
         "security/inventory_designer_security.xml",
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/menu_structure.xml",  # First define base menus
         "views/shipstation_views.xml",  # Then load ShipStation views with actions
         "views/api_product_tree_view.xml",
         "views/api_product_kanban_view.xml",
+        "views/api_product_templates.xml",
         "views/api_product_form_view.xml",
         "views/api_product_search_view.xml",
         "views/api_product_actions.xml",
@@ -34,8 +36,10 @@
         "views/menu_override.xml",
         "views/hide_inventory_menus.xml",
         "views/admin_views.xml",
+        "views/webhook_event_views.xml",
         "views/inventory_designer_views.xml",
         "views/inventory_dashboard_view.xml",
+        "views/res_config_settings_views.xml",
     ],
     "assets": {
         "web.assets_backend": [
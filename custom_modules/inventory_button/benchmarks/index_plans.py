@@ -0,0 +1,162 @@
+"""Benchmark: query plans of the hot api.product filters with and without indexes
+
+Loads 500k orders, then prints the plan and execution time of the dashboard,
+kanban and ingestion queries once with the module's indexes and once after
+dropping them. Run it in an Odoo shell on a copy of a database with the
+module installed (dropping the indexes locks the table until the end); all
+the data and index changes are rolled back at the end:
+
+    odoo shell -d <database> < custom_modules/inventory_button/benchmarks/index_plans.py
+"""
+import time
+
+PRODUCTS = 500000
+SOURCES = 10
+DESIGNERS = 20
+STORES = 50
+ORDER_STATUSES = ["awaiting_shipment", "shipped", "on_hold", "cancelled"]
+STATES = ["all_orders", "processing", "approving", "done", "synced_with_shipstation"]
+
+# Indexes added on api.product for these filters, dropped for the "before" run
+INDEXES = [
+    "api_product_designer_id_state_index",
+    "api_product_date_state_index",
+    "api_product__state_index",
+    "api_product__order_number_index",
+    "api_product__order_status_index",
+    "api_product__store_id_index",
+]
+CONSTRAINTS = ["api_product_source_order_number_uniq"]
+
+QUERIES = {
+    "Dashboard KPIs over 30 days": """
+        SELECT state, COUNT(*), SUM(order_total)
+        FROM api_product
+        WHERE date >= CURRENT_DATE - 30 AND date <= CURRENT_DATE
+        GROUP BY state
+    """,
+    "Designer workload": """
+        SELECT COUNT(*) FROM api_product
+        WHERE designer_id = %(designer_id)s AND state = 'processing'
+    """,
+    "Kanban column": """
+        SELECT id FROM api_product
+        WHERE state = 'approving'
+        ORDER BY priority DESC, design_difficulty DESC, name
+        LIMIT 80
+    """,
+    "Awaiting shipment orders": """
+        SELECT COUNT(*) FROM api_product WHERE order_status = 'awaiting_shipment'
+    """,
+    "Orders of a store": """
+        SELECT id FROM api_product WHERE store_id = %(store_id)s LIMIT 500
+    """,
+    "Import page lookup (500 order numbers)": """
+        SELECT id, order_number, order_status FROM api_product
+        WHERE source_id = %(source_id)s AND order_number IN %(order_numbers)s
+    """,
+}
+
+
+def _explain(cr, params):
+    """Print the table scans and execution time of each query"""
+    for label, query in QUERIES.items():
+        cr.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+        plan = [row[0] for row in cr.fetchall()]
+        # e.g. "->  Index Scan using api_product__store_id_index on api_product"
+        scans = sorted(
+            {line.split("(cost=")[0].strip(" ->") for line in plan if "Scan" in line}
+        )
+        print(f"  {label}: {plan[-1].strip()}")
+        for scan in scans:
+            print(f"      {scan}")
+
+
+def run(env, products=PRODUCTS):
+    cr = env.cr
+    try:
+        source_ids = env["inventory.admin.settings"].create(
+            [
+                {
+                    "name": f"Benchmark source {i}",
+                    "source_identifier": f"benchmark-source-{i}",
+                    "api_key": "benchmark",
+                    "api_secret": "benchmark",
+                }
+                for i in range(SOURCES)
+            ]
+        ).ids
+        cr.execute(
+            """
+            INSERT INTO inventory_designer (name, email)
+            SELECT 'Benchmark designer ' || n, 'designer' || n || '@example.com'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """,
+            (DESIGNERS,),
+        )
+        designer_ids = [row[0] for row in cr.fetchall()]
+
+        # Insert the orders with SQL, creating them with the ORM would
+        # dominate the run time
+        started = time.perf_counter()
+        cr.execute(
+            """
+            INSERT INTO api_product (api_id, name, order_number, order_status, state,
+                                     date, source_id, store_id, designer_id, priority,
+                                     create_uid, write_uid, create_date, write_date)
+            SELECT n, 'Benchmark order ' || n, 'BENCH-' || n,
+                   (%(statuses)s::varchar[])[1 + n %% %(status_count)s],
+                   (%(states)s::varchar[])[1 + (n / 7) %% %(state_count)s],
+                   CURRENT_DATE - (n %% 730),
+                   (%(source_ids)s::integer[])[1 + n %% %(source_count)s],
+                   100000 + n %% %(store_count)s,
+                   (%(designer_ids)s::integer[])[1 + n %% %(designer_count)s],
+                   (n %% 4) * 10,
+                   %(uid)s, %(uid)s, now() at time zone 'UTC', now() at time zone 'UTC'
+            FROM generate_series(1, %(products)s) AS n
+        """,
+            {
+                "statuses": ORDER_STATUSES,
+                "status_count": len(ORDER_STATUSES),
+                "states": STATES,
+                "state_count": len(STATES),
+                "source_ids": source_ids,
+                "source_count": len(source_ids),
+                "store_count": STORES,
+                "designer_ids": designer_ids,
+                "designer_count": len(designer_ids),
+                "uid": env.uid,
+                "products": products,
+            },
+        )
+        print(f"Inserted {products} orders in {time.perf_counter() - started:.1f}s")
+        cr.execute("ANALYZE api_product")
+
+        params = {
+            "designer_id": designer_ids[0],
+            "store_id": 100000,
+            "source_id": source_ids[0],
+            # One import page: orders of the source spread over the table
+            "order_numbers": tuple(
+                f"BENCH-{n}" for n in range(SOURCES, SOURCES * 501, SOURCES)
+            ),
+        }
+
+        print("With indexes:")
+        _explain(cr, params)
+
+        for constraint in CONSTRAINTS:
+            cr.execute(f"ALTER TABLE api_product DROP CONSTRAINT IF EXISTS {constraint}")
+        for index in INDEXES:
+            cr.execute(f"DROP INDEX IF EXISTS {index}")
+        cr.execute("ANALYZE api_product")
+
+        print("Without indexes:")
+        _explain(cr, params)
+    finally:
+        cr.rollback()
+
+
+if __name__ == "__main__":
+    run(env)  # noqa: F821 - provided by odoo shell
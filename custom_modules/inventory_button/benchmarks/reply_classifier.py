@@ -0,0 +1,99 @@
+"""Benchmark: classify a corpus of customer reply bodies
+
+Compares the precompiled classifier (models/reply_classifier.py) with the
+previous inline implementation of _process_email_content. Plain Python, no
+Odoo needed:
+
+    python custom_modules/inventory_button/benchmarks/reply_classifier.py
+"""
+import importlib.util
+import os
+import re
+import timeit
+
+ITERATIONS = 2000
+
+_path = os.path.join(os.path.dirname(__file__), "..", "models", "reply_classifier.py")
+_spec = importlib.util.spec_from_file_location("reply_classifier", _path)
+reply_classifier = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(reply_classifier)
+
+QUOTED_ODOO = """
+<div data-o-mail-quote="1">
+    <p>Please reply with one of the following options:</p>
+    <p>1. Approve - if you are satisfied with the design</p>
+    <p>2. Develop - if the design needs further development</p>
+    <div>Reference: Product SKU-1042 [Main Store] (ID: 5121)</div>
+</div>
+"""
+
+# Reply bodies in the shapes the mail gateway hands to message_new/message_update
+CORPUS = [
+    ("<p>1</p>" + QUOTED_ODOO, "approve"),
+    ("<div>Approved, thank you!</div>" + QUOTED_ODOO, "approve"),
+    ("<p>Looks great, approve.</p><blockquote>" + QUOTED_ODOO + "</blockquote>", "approve"),
+    ("<p>We agreed on the first version, go ahead</p>" + QUOTED_ODOO, "approve"),
+    ("1.\r\n\r\nOn Mon, Apr 21, 2025 at 10:12 AM Design Team <design@example.com> wrote:\r\n> 1. Approve", "approve"),
+    ("<p>2 - the text needs to be bigger</p>" + QUOTED_ODOO, "develop"),
+    ("<p>Could you adjust the color to navy blue?</p>" + QUOTED_ODOO, "develop"),
+    ("<p>Please change the font and move the logo up</p>" + QUOTED_ODOO, "develop"),
+    ("<p>Develop: add my daughter's name under the picture</p>" + QUOTED_ODOO, "develop"),
+    ("Hi, can you make it 10 inches wide?\n\n-----Original Message-----\nFrom: design@example.com\n1. Approve\n2. Develop", None),
+    ("<p>Thanks! When will it ship?</p>" + QUOTED_ODOO, None),
+    ("<p>I'll check with my husband and come back to you on 12/05.</p>" + QUOTED_ODOO, None),
+    ("<p>Order #10021 - is it shipped?</p>________________________________\nFrom: Design Team\n1. Approve", None),
+]
+
+
+def legacy_classify(body):
+    """Previous logic of _process_email_content, for comparison"""
+    reply_text = body
+    quote_markers = [
+        "<div data-o-mail-quote",
+        "<blockquote",
+        "On .* wrote:",
+        "---Original Message---",
+        "------ Reply Message ------",
+        "________________________________",
+    ]
+    for marker in quote_markers:
+        match = re.search(marker, body, re.IGNORECASE | re.DOTALL)
+        if match:
+            reply_text = body[: match.start()]
+            break
+    reply_text = reply_text.lower()
+    if "1" in reply_text or "approve" in reply_text or "agreed" in reply_text:
+        return "approve"
+    if (
+        "2" in reply_text
+        or "develop" in reply_text
+        or "change" in reply_text
+        or "need" in reply_text
+        or "adjust" in reply_text
+    ):
+        return "develop"
+    return None
+
+
+def run(iterations=ITERATIONS):
+    bodies = [body.lower() for body, expected in CORPUS]
+
+    for name, classify in [
+        ("legacy", legacy_classify),
+        ("compiled", lambda body: reply_classifier.classify_reply(body)[0]),
+    ]:
+        correct = sum(
+            classify(body) == expected for body, (_body, expected) in zip(bodies, CORPUS)
+        )
+        elapsed = timeit.timeit(
+            lambda: [classify(body) for body in bodies], number=iterations
+        )
+        per_reply_us = elapsed / (iterations * len(bodies)) * 1e6
+        print(
+            f"{name:>8}: {correct}/{len(CORPUS)} correctly classified, "
+            f"{per_reply_us:.1f} us per reply"
+        )
+
+
+if __name__ == "__main__":
+    run()
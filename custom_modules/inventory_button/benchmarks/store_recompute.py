@@ -0,0 +1,91 @@
+"""Benchmark: recompute the store fields of 100k orders spread over 10 sources
+
+Run it in an Odoo shell on a database with the module installed. All the
+data it creates is rolled back at the end:
+
+    odoo shell -d <database> < custom_modules/inventory_button/benchmarks/store_recompute.py
+"""
+import time
+
+PRODUCTS = 100000
+SOURCES = 10
+STORES_PER_SOURCE = 5
+STORE_FIELDS = ["shipstation_store_id", "store_name", "store_color"]
+
+
+def _timed_flush(env, label):
+    """Flush the pending recomputations of the store fields and print the time"""
+    started = time.perf_counter()
+    env["api.product"].flush_model(STORE_FIELDS)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {elapsed:.2f}s")
+    return elapsed
+
+
+def run(env, products=PRODUCTS, sources=SOURCES, stores_per_source=STORES_PER_SOURCE):
+    cr = env.cr
+    ApiProduct = env["api.product"]
+    try:
+        source_records = env["inventory.admin.settings"].create(
+            [
+                {
+                    "name": f"Benchmark source {i}",
+                    "source_identifier": f"benchmark-source-{i}",
+                    "api_key": "benchmark",
+                    "api_secret": "benchmark",
+                }
+                for i in range(sources)
+            ]
+        )
+        stores = env["shipstation.store"].create(
+            [
+                {
+                    "source_id": source.id,
+                    "store_id": 1000 + i,
+                    "name": f"{source.name} store {i}",
+                    "color": "#336699",
+                }
+                for source in source_records
+                for i in range(stores_per_source)
+            ]
+        )
+
+        # Insert the orders with SQL, creating them with the ORM would
+        # dominate the run time
+        cr.execute(
+            """
+            INSERT INTO api_product (api_id, name, state, source_id, store_id,
+                                     create_uid, write_uid, create_date, write_date)
+            SELECT n, 'Benchmark order ' || n, 'all_orders',
+                   (%s::integer[])[1 + n %% %s], 1000 + n %% %s,
+                   %s, %s, now() at time zone 'UTC', now() at time zone 'UTC'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """,
+            (
+                source_records.ids,
+                sources,
+                stores_per_source,
+                env.uid,
+                env.uid,
+                products,
+            ),
+        )
+        records = ApiProduct.browse([row[0] for row in cr.fetchall()])
+        print(f"{len(records)} orders, {sources} sources, {len(stores)} stores")
+
+        # Full recompute, as after an upgrade or a data import
+        env.invalidate_all()
+        for name in STORE_FIELDS:
+            env.add_to_compute(ApiProduct._fields[name], records)
+        _timed_flush(env, "Recompute store of all orders")
+
+        # Renaming one store per source only recomputes the names of its orders
+        stores.filtered(lambda store: store.store_id == 1000).write({"name": "Renamed"})
+        _timed_flush(env, "Rename one store per source")
+    finally:
+        cr.rollback()
+
+
+if __name__ == "__main__":
+    run(env)  # noqa: F821 - provided by odoo shell
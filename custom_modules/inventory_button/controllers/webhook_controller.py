@@ -85,22 +85,16 @@ class ShipStationWebhookController(http.Controller):
                     }
                 )
 
-            # Process the webhook data - call the API product model to handle it
-            api_product_model = request.env["api.product"].sudo()
-            result = api_product_model.process_webhook_data(data)
+            # Queue the webhook and answer right away; the queue worker (cron)
+            # runs the ShipStation fetch outside of this HTTP request
+            event = request.env["shipstation.webhook.event"].sudo().enqueue(data)
 
-            # Create more detailed response message
-            response_message = "Webhook processed successfully"
-            if isinstance(result, dict) and "params" in result:
-                if "message" in result["params"]:
-                    response_message = result["params"]["message"]
-
-            _logger.info(f"Webhook processed successfully: {result}")
+            _logger.info(f"Webhook queued as event {event.id}")
             return json.dumps(
                 {
                     "status": "success",
-                    "message": response_message,
-                    "details": str(result),
+                    "message": "Webhook queued for processing",
+                    "event_id": event.id,
                 }
             )
 
@@ -0,0 +1,9 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the structured shipping address columns of existing orders"""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["api.product"]._backfill_ship_address_fields()
@@ -0,0 +1,32 @@
+import json
+import logging
+
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Move the store_ids_data JSON of the API sources into shipstation.store records"""
+    if not version or not column_exists(cr, "inventory_admin_settings", "store_ids_data"):
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute(
+        """
+        SELECT id, store_ids_data
+        FROM inventory_admin_settings
+        WHERE store_ids_data IS NOT NULL AND store_ids_data != ''
+    """
+    )
+    for source_id, store_ids_data in cr.fetchall():
+        try:
+            stores_data = json.loads(store_ids_data)
+        except ValueError:
+            _logger.warning(f"Skipping invalid store data of API source {source_id}")
+            continue
+        source = env["inventory.admin.settings"].browse(source_id)
+        env["shipstation.store"]._sync_source_stores(source, stores_data)
+
+    env.flush_all()
+    cr.execute("ALTER TABLE inventory_admin_settings DROP COLUMN store_ids_data")
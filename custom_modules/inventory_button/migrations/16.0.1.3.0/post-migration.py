@@ -0,0 +1,9 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Create the order lines of existing orders from their item_details"""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["api.product"]._backfill_product_lines()
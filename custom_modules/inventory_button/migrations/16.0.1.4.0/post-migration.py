@@ -0,0 +1,14 @@
+def migrate(cr, version):
+    """Fill the per-user unread index and drop the old stored sort column"""
+    if not version:
+        return
+    cr.execute(
+        """
+        INSERT INTO api_product_unread_user_rel (product_id, user_id)
+        SELECT id, user_id
+        FROM api_product
+        WHERE unread_messages AND user_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """
+    )
+    cr.execute("ALTER TABLE api_product DROP COLUMN IF EXISTS user_unread_priority")
@@ -0,0 +1,19 @@
+from odoo import api, SUPERUSER_ID
+from odoo.exceptions import UserError
+from odoo.tools.sql import constraint_definition
+
+
+def migrate(cr, version):
+    """Make sure the unique order key exists and rebuild the statistics"""
+    if not version:
+        return
+    # Odoo only logs a warning when a constraint can't be added; imports rely
+    # on this one to never create an order twice
+    if not constraint_definition(cr, "api_product", "api_product_source_order_number_uniq"):
+        raise UserError(
+            "The unique (source_id, order_number) key of api_product could not be "
+            "created, remove the remaining duplicate orders and update the module again"
+        )
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    # Duplicates merged by the pre-migration were counted in the rollup
+    env["inventory.api.statistics"]._rebuild_statistics()
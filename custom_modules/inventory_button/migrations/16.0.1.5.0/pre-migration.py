@@ -0,0 +1,116 @@
+import logging
+
+from odoo.tools.sql import table_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Merge orders imported twice for the same source
+
+    The unique (source_id, order_number) key can only be created once the
+    duplicates are gone. Of each group of duplicates the order with a
+    designer, then with the most advanced state, then the oldest one is kept;
+    the chatter, followers, activities, attachments and unread flags of the
+    others move to it before they are deleted.
+    """
+    if not version:
+        return
+    cr.execute(
+        """
+        CREATE TEMPORARY TABLE api_product_duplicate ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM (
+            SELECT id,
+                   first_value(id) OVER (
+                       PARTITION BY source_id, order_number
+                       ORDER BY designer_id IS NOT NULL DESC,
+                                state IS DISTINCT FROM 'all_orders' DESC,
+                                id
+                   ) AS keep_id
+            FROM api_product
+            WHERE source_id IS NOT NULL AND order_number IS NOT NULL
+        ) AS ranked
+        WHERE id != keep_id
+    """
+    )
+    if not cr.rowcount:
+        return
+
+    # Kept orders without items take the lines of one of their duplicates.
+    # Databases older than 16.0.1.3.0 don't have order lines yet, their
+    # post-migration builds them from the orders that are kept.
+    if table_exists(cr, "api_product_line"):
+        cr.execute(
+            """
+            UPDATE api_product_line AS line
+            SET product_id = d.keep_id
+            FROM api_product_duplicate AS d
+            WHERE line.product_id = d.id
+              AND d.id = (SELECT MIN(id) FROM api_product_duplicate WHERE keep_id = d.keep_id)
+              AND NOT EXISTS (SELECT 1 FROM api_product_line WHERE product_id = d.keep_id)
+        """
+        )
+
+    # One follower per partner on the kept order, keeping its subtypes
+    cr.execute(
+        """
+        UPDATE mail_followers AS f
+        SET res_id = d.keep_id
+        FROM api_product_duplicate AS d
+        WHERE f.res_model = 'api.product' AND f.res_id = d.id
+          AND f.id IN (
+              SELECT DISTINCT ON (d2.keep_id, f2.partner_id) f2.id
+              FROM mail_followers AS f2
+              JOIN api_product_duplicate AS d2 ON f2.res_id = d2.id
+              WHERE f2.res_model = 'api.product'
+              ORDER BY d2.keep_id, f2.partner_id, f2.id
+          )
+          AND NOT EXISTS (
+              SELECT 1 FROM mail_followers AS k
+              WHERE k.res_model = 'api.product' AND k.res_id = d.keep_id
+                AND k.partner_id = f.partner_id
+          )
+    """
+    )
+    cr.execute(
+        """
+        DELETE FROM mail_followers AS f
+        USING api_product_duplicate AS d
+        WHERE f.res_model = 'api.product' AND f.res_id = d.id
+    """
+    )
+    for table, model_column in [
+        ("mail_message", "model"),
+        ("mail_activity", "res_model"),
+        ("ir_attachment", "res_model"),
+    ]:
+        cr.execute(
+            f"""
+            UPDATE {table} AS t
+            SET res_id = d.keep_id
+            FROM api_product_duplicate AS d
+            WHERE t.{model_column} = 'api.product' AND t.res_id = d.id
+        """
+        )
+    # Likewise the unread relation only exists from 16.0.1.4.0 on
+    if table_exists(cr, "api_product_unread_user_rel"):
+        cr.execute(
+            """
+            INSERT INTO api_product_unread_user_rel (product_id, user_id)
+            SELECT d.keep_id, rel.user_id
+            FROM api_product_unread_user_rel AS rel
+            JOIN api_product_duplicate AS d ON rel.product_id = d.id
+            ON CONFLICT DO NOTHING
+        """
+        )
+    # Open wizards can't point to a deleted order
+    cr.execute(
+        """
+        DELETE FROM shipstation_selection_wizard AS w
+        USING api_product_duplicate AS d
+        WHERE w.product_id = d.id
+    """
+    )
+    cr.execute("DELETE FROM api_product WHERE id IN (SELECT id FROM api_product_duplicate)")
+    _logger.info(f"Merged {cr.rowcount} duplicate orders before adding their unique key")
@@ -1,12 +1,17 @@
 from . import api_product_base
+from . import api_product_line
 from . import api_product_email
 from . import api_product_assignment
 from . import api_product_api
 from . import shipstation_wizard
 from . import send_message
+from . import res_config_settings
+from . import res_partner
 from . import admin_settings
 from . import api_statistics
 from . import inventory_designer
 from . import inventory_dashboard
 from . import bulk_actions_wizard
 from . import shipstation_option
+from . import shipstation_store
+from . import webhook_event
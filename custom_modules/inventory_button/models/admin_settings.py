@@ -1,13 +1,17 @@
 from odoo import models, fields, api, _
-import requests
-import base64
 import logging
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import os
 
+from .shipstation_client import ShipStationClient
+
 _logger = logging.getLogger(__name__)
 
+# Default number of API sources fetched in parallel
+DEFAULT_FETCH_MAX_WORKERS = 4
+
 
 class AdminSettings(models.Model):
     _name = "inventory.admin.settings"
@@ -41,15 +45,11 @@ class AdminSettings(models.Model):
     )
 
     # Store information
-    store_ids_data = fields.Text(
-        string="Store IDs JSON",
-        help="JSON data containing ShipStation store IDs and names",
-    )
-
-    store_ids_display = fields.Html(
-        string="Available Stores",
-        compute="_compute_store_ids_display",
-        help="Displays all available store IDs from ShipStation",
+    store_ids = fields.One2many(
+        "shipstation.store",
+        "source_id",
+        string="Stores",
+        help="ShipStation stores of this source",
     )
 
     # Webhook fields
@@ -91,6 +91,12 @@ class AdminSettings(models.Model):
     # API status tracking fields
     last_fetch_date = fields.Datetime(string="Last API Fetch", readonly=True)
     last_webhook_date = fields.Datetime(string="Last Webhook Trigger", readonly=True)
+    last_sync_modify_date = fields.Datetime(
+        string="Synced Up To",
+        readonly=True,
+        help="Latest ShipStation modifyDate imported by the awaiting shipment sync "
+        "(ShipStation time). The next sync only requests orders modified since then.",
+    )
     api_status = fields.Selection(
         [
             ("success", "Connected"),
@@ -111,6 +117,22 @@ class AdminSettings(models.Model):
         help="Number of orders fetched from this source",
     )
 
+    # ShipStation client metrics (since server start, for this worker)
+    api_call_count = fields.Integer(
+        string="API Calls", compute="_compute_api_metrics"
+    )
+    api_retry_count = fields.Integer(
+        string="API Retries",
+        compute="_compute_api_metrics",
+        help="Calls retried after a 429 or 5xx response",
+    )
+    api_avg_latency_ms = fields.Float(
+        string="Avg. API Latency (ms)", compute="_compute_api_metrics", digits=(10, 0)
+    )
+    api_max_latency_ms = fields.Float(
+        string="Max. API Latency (ms)", compute="_compute_api_metrics", digits=(10, 0)
+    )
+
     _sql_constraints = [
         (
             "unique_source_identifier",
@@ -128,13 +150,53 @@ class AdminSettings(models.Model):
     def write(self, vals):
         """Override write to set last updated timestamp"""
         vals["last_updated"] = fields.Datetime.now()
-        return super(AdminSettings, self).write(vals)
+        if "api_key" not in vals and "api_secret" not in vals:
+            return super(AdminSettings, self).write(vals)
+        old_credentials = {record.get_api_credentials() for record in self}
+        result = super(AdminSettings, self).write(vals)
+        self._discard_shipstation_clients(old_credentials)
+        return result
+
+    def unlink(self):
+        """Override unlink to close the ShipStation clients of removed sources"""
+        old_credentials = {record.get_api_credentials() for record in self}
+        result = super(AdminSettings, self).unlink()
+        self._discard_shipstation_clients(old_credentials)
+        return result
+
+    @api.model
+    def _discard_shipstation_clients(self, credentials):
+        """Close the pooled clients of credentials no source uses any more"""
+        for api_key, api_secret in credentials:
+            if api_key and api_secret and not self.sudo().search_count(
+                [("api_key", "=", api_key), ("api_secret", "=", api_secret)]
+            ):
+                ShipStationClient.discard_client(api_key, api_secret)
 
     def get_api_credentials(self):
         """Get API credentials for use in API calls"""
         self.ensure_one()
         return self.api_key, self.api_secret
 
+    def _get_shipstation_client(self):
+        """Get the shared, pooled ShipStation HTTP client for this source"""
+        self.ensure_one()
+        return ShipStationClient.get_client(*self.get_api_credentials())
+
+    def _compute_api_metrics(self):
+        """Expose the in-memory call metrics of the source's ShipStation client"""
+        for record in self:
+            # Reading the metrics must not open a client for sources never called
+            client = ShipStationClient.find_client(*record.get_api_credentials())
+            if client:
+                metrics = client.get_metrics()
+            else:
+                metrics = {"calls": 0, "retries": 0, "avg_ms": 0.0, "max_ms": 0.0}
+            record.api_call_count = metrics["calls"]
+            record.api_retry_count = metrics["retries"]
+            record.api_avg_latency_ms = metrics["avg_ms"]
+            record.api_max_latency_ms = metrics["max_ms"]
+
     def test_api_connection(self):
         """Test the connection to the API using stored credentials"""
         self.ensure_one()
@@ -159,14 +221,7 @@ class AdminSettings(models.Model):
             }
 
         try:
-            # Create authorization string (API Key:API Secret) and encode it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
+            client = self._get_shipstation_client()
 
             # Test parameters - just get a single order to verify connection
             params = {
@@ -176,9 +231,7 @@ class AdminSettings(models.Model):
             _logger.info(
                 f"Testing connection to API at: {self.api_url} (Source: {self.source_identifier})"
             )
-            response = requests.get(
-                self.api_url, headers=headers, params=params, timeout=10
-            )
+            response = client.get(self.api_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 _logger.info(
@@ -264,16 +317,22 @@ class AdminSettings(models.Model):
         self.ensure_one()
         self.write({"last_webhook_date": fields.Datetime.now()})
 
+    def update_last_sync_modify_date(self, modify_date):
+        """Move the incremental sync high-water mark forward"""
+        self.ensure_one()
+        if not self.last_sync_modify_date or modify_date > self.last_sync_modify_date:
+            self.write({"last_sync_modify_date": modify_date})
+
     def increment_orders_count(self, count=1):
         """Increment the number of orders fetched from this source"""
         self.ensure_one()
         self.write({"orders_count": self.orders_count + count})
 
-    def fetch_and_store_api_data(self):
+    def fetch_and_store_api_data(self, full_resync=False):
         """Trigger API data fetch from the admin settings form for this source only"""
         self.ensure_one()
         api_product = self.env["api.product"]
-        result = api_product.fetch_from_source(self)
+        result = api_product.fetch_from_source(self, full_resync=full_resync)
 
         # Update API status to "tested" after fetch
         if result.get("params", {}).get("type") == "success":
@@ -286,8 +345,129 @@ class AdminSettings(models.Model):
 
         return result
 
+    def action_full_resync(self):
+        """Download the whole awaiting shipment window again, ignoring the high-water mark"""
+        self.ensure_one()
+        return self.fetch_and_store_api_data(full_resync=True)
+
     @api.model
-    def fetch_all_sources(self):
+    def _get_fetch_max_workers(self):
+        """Maximum number of sources fetched in parallel (inventory_button.fetch_max_workers)"""
+        value = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_button.fetch_max_workers", DEFAULT_FETCH_MAX_WORKERS)
+        )
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            _logger.warning(f"Invalid inventory_button.fetch_max_workers value: {value}")
+            return DEFAULT_FETCH_MAX_WORKERS
+
+    def _fetch_source_group(self, source_ids, filter_status, full_resync):
+        """Fetch a group of sources one after the other in a dedicated cursor
+
+        Runs in a worker thread, so it opens its own cursor and environment;
+        fetch_from_source commits page by page on that cursor.
+
+        :return: list of (source name, fetch result) tuples
+        """
+        results = []
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            api_product = env["api.product"]
+            for source in env[self._name].browse(source_ids):
+                source_name = source.name
+                try:
+                    result = api_product.fetch_from_source(
+                        source, filter_status=filter_status, full_resync=full_resync
+                    )
+                except Exception as e:
+                    _logger.error(f"Error fetching from source {source_name}: {str(e)}")
+                    cr.rollback()
+                    result = None
+                results.append((source_name, result))
+        return results
+
+    def _fetch_sources(self, filter_status=True, full_resync=False):
+        """Fetch orders for the sources in self and summarize the results
+
+        Sources sharing an API key are fetched serially (ShipStation rate limits
+        per key); different keys are fetched concurrently by a bounded pool of
+        worker threads, each with its own cursor.
+
+        :return: tuple (success_count, error_count, orders_count)
+        """
+        # Group sources by API key so a key is never used by two workers at once
+        groups = {}
+        for source in self:
+            groups.setdefault(source.api_key, []).append(source.id)
+
+        max_workers = min(self._get_fetch_max_workers(), len(groups))
+        testing = getattr(threading.current_thread(), "testing", False)
+
+        results = []
+        if max_workers <= 1 or testing:
+            # Serial mode: reuse the current transaction
+            api_product = self.env["api.product"]
+            for source in self:
+                try:
+                    _logger.info(
+                        f"Fetching data from source: {source.name} ({source.source_identifier})"
+                    )
+                    result = api_product.fetch_from_source(
+                        source, filter_status=filter_status, full_resync=full_resync
+                    )
+                except Exception as e:
+                    _logger.error(f"Error fetching from source {source.name}: {str(e)}")
+                    result = None
+                results.append((source.name, result))
+        else:
+            _logger.info(
+                f"Fetching {len(self)} sources ({len(groups)} API keys) with {max_workers} workers"
+            )
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="shipstation_fetch"
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        self._fetch_source_group, source_ids, filter_status, full_resync
+                    )
+                    for source_ids in groups.values()
+                ]
+                for future in as_completed(futures):
+                    try:
+                        results.extend(future.result())
+                    except Exception as e:
+                        _logger.error(f"Error in source fetch worker: {str(e)}")
+            # Workers committed on their own cursors; reload what they changed
+            self.env.invalidate_all()
+
+        success_count = 0
+        error_count = 0
+        orders_count = 0
+        for source_name, result in results:
+            # Check if the fetch was successful
+            if result and result.get("params", {}).get("type") == "success":
+                success_count += 1
+                # Extract orders processed count from the message
+                msg = result.get("params", {}).get("message", "")
+                if "orders processed:" in msg:
+                    try:
+                        count_str = (
+                            msg.split("orders processed:")[1].split(".")[0].strip()
+                        )
+                        processed = int(count_str)
+                        orders_count += processed
+                    except (ValueError, IndexError):
+                        pass
+            else:
+                error_count += 1
+
+        return success_count, error_count, orders_count
+
+    @api.model
+    def fetch_all_sources(self, full_resync=False):
         """Fetch data from all active API sources"""
         active_sources = self.search([("is_active", "=", True)])
         if not active_sources:
@@ -302,39 +482,9 @@ class AdminSettings(models.Model):
                 },
             }
 
-        api_product = self.env["api.product"]
-        results = []
-        success_count = 0
-        error_count = 0
-        orders_count = 0
-
-        for source in active_sources:
-            try:
-                _logger.info(
-                    f"Fetching data from source: {source.name} ({source.source_identifier})"
-                )
-                result = api_product.fetch_from_source(source)
-                results.append(result)
-
-                # Check if the fetch was successful
-                if result.get("params", {}).get("type") == "success":
-                    success_count += 1
-                    # Extract orders processed count from the message
-                    msg = result.get("params", {}).get("message", "")
-                    if "orders processed:" in msg:
-                        try:
-                            count_str = (
-                                msg.split("orders processed:")[1].split(".")[0].strip()
-                            )
-                            processed = int(count_str)
-                            orders_count += processed
-                        except (ValueError, IndexError):
-                            pass
-                else:
-                    error_count += 1
-            except Exception as e:
-                _logger.error(f"Error fetching from source {source.name}: {str(e)}")
-                error_count += 1
+        success_count, error_count, orders_count = active_sources._fetch_sources(
+            full_resync=full_resync
+        )
 
         # Return a summary notification
         return {
@@ -384,40 +534,10 @@ class AdminSettings(models.Model):
                 },
             }
 
-        api_product = self.env["api.product"]
-        results = []
-        success_count = 0
-        error_count = 0
-        orders_count = 0
-
-        for source in active_sources:
-            try:
-                _logger.info(
-                    f"Fetching all orders from source: {source.name} ({source.source_identifier})"
-                )
-                # Pass filter_status=False to disable the awaiting_shipment filter
-                result = api_product.fetch_from_source(source, filter_status=False)
-                results.append(result)
-
-                # Check if the fetch was successful
-                if result.get("params", {}).get("type") == "success":
-                    success_count += 1
-                    # Extract orders processed count from the message
-                    msg = result.get("params", {}).get("message", "")
-                    if "orders processed:" in msg:
-                        try:
-                            count_str = (
-                                msg.split("orders processed:")[1].split(".")[0].strip()
-                            )
-                            processed = int(count_str)
-                            orders_count += processed
-                        except (ValueError, IndexError):
-                            pass
-                else:
-                    error_count += 1
-            except Exception as e:
-                _logger.error(f"Error fetching from source {source.name}: {str(e)}")
-                error_count += 1
+        # Pass filter_status=False to disable the awaiting_shipment filter
+        success_count, error_count, orders_count = active_sources._fetch_sources(
+            filter_status=False
+        )
 
         # Return a summary notification
         return {
@@ -463,14 +583,7 @@ class AdminSettings(models.Model):
             }
 
         try:
-            # Create authorization string (API Key:API Secret) and encode it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
+            client = self._get_shipstation_client()
 
             # Build source-specific webhook URL by appending the source identifier
             # Check if the base URL already ends with a slash
@@ -490,10 +603,7 @@ class AdminSettings(models.Model):
             _logger.info(f"Webhook data: {webhook_data}")
 
             # Subscribe to webhook
-            webhook_url = "https://ssapi.shipstation.com/webhooks/subscribe"
-            response = requests.post(
-                webhook_url, headers=headers, json=webhook_data, timeout=15
-            )
+            response = client.post("/webhooks/subscribe", json=webhook_data, timeout=15)
 
             if response.status_code in (200, 201):
                 _logger.info(
@@ -611,24 +721,16 @@ class AdminSettings(models.Model):
             }
 
         try:
-            # Create authorization string (API Key:API Secret) and encode it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
+            client = self._get_shipstation_client()
 
             _logger.info(
                 f"Unsubscribing from webhook for source {self.source_identifier}"
             )
 
             # Unsubscribe from webhook
-            webhook_url = (
-                f"https://ssapi.shipstation.com/webhooks/{self.webhook_subscription_id}"
+            response = client.delete(
+                f"/webhooks/{self.webhook_subscription_id}", timeout=15
             )
-            response = requests.delete(webhook_url, headers=headers, timeout=15)
 
             if response.status_code in (200, 204):
                 _logger.info(
@@ -689,33 +791,6 @@ class AdminSettings(models.Model):
                 },
             }
 
-    @api.depends("store_ids_data")
-    def _compute_store_ids_display(self):
-        """Parse the store_ids_data JSON and format it as HTML for display"""
-        for record in self:
-            html_content = "<table class='table table-sm table-striped'><thead><tr><th>Store ID</th><th>Store Name</th><th>Color</th></tr></thead><tbody>"
-
-            if record.store_ids_data:
-                try:
-                    stores = json.loads(record.store_ids_data)
-                    for store in stores:
-                        # Extract store details
-                        store_id = store.get("storeId", "")
-                        store_name = store.get("storeName", "")
-                        store_color = store.get("color", "#CCCCCC")
-
-                        # Add row to table
-                        html_content += f"<tr><td>{store_id}</td><td>{store_name}</td><td style='background-color:{store_color};'>{store_color}</td></tr>"
-                except Exception as e:
-                    html_content += (
-                        f"<tr><td colspan='3'>Error parsing stores: {str(e)}</td></tr>"
-                    )
-            else:
-                html_content += "<tr><td colspan='3'>No store information available. Use the 'Update Stores' button to fetch store data.</td></tr>"
-
-            html_content += "</tbody></table>"
-            record.store_ids_display = html_content
-
     def fetch_store_information(self):
         """Fetch store information from ShipStation API"""
         self.ensure_one()
@@ -734,22 +809,14 @@ class AdminSettings(models.Model):
             }
 
         try:
-            # Create authorization string (API Key:API Secret) and encode it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
+            client = self._get_shipstation_client()
 
             _logger.info(
                 f"Fetching store information for source {self.source_identifier}"
             )
 
             # Fetch stores from ShipStation API
-            stores_url = "https://ssapi.shipstation.com/stores"
-            response = requests.get(stores_url, headers=headers, timeout=15)
+            response = client.get("/stores", timeout=15)
 
             if response.status_code == 200:
                 _logger.info(
@@ -777,13 +844,8 @@ class AdminSettings(models.Model):
                     else:
                         store["color"] = "#CCCCCC"  # Default gray for unknown stores
 
-                # Store the raw JSON data
-                self.write(
-                    {
-                        "store_ids_data": json.dumps(stores_data),
-                        "last_updated": fields.Datetime.now(),
-                    }
-                )
+                self.env["shipstation.store"]._sync_source_stores(self, stores_data)
+                self.write({"last_updated": fields.Datetime.now()})
 
                 # Count the number of stores fetched
                 stores_count = len(stores_data)
@@ -874,22 +936,14 @@ class AdminSettings(models.Model):
             return None
 
         try:
-            # Create authorization string (API Key:API Secret) and encode it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
+            client = self._get_shipstation_client()
 
             _logger.info(
                 f"Fetching store {store_id} for source {self.source_identifier}"
             )
 
             # Fetch store from ShipStation API
-            store_url = f"https://ssapi.shipstation.com/stores/{store_id}"
-            response = requests.get(store_url, headers=headers, timeout=15)
+            response = client.get(f"/stores/{store_id}", timeout=15)
 
             if response.status_code == 200:
                 _logger.info(
@@ -1,18 +1,54 @@
+import hashlib
 import os
+import re
+import threading
 from odoo import models, fields, api
+from odoo.tools.lru import LRU
+from odoo.tools.sql import constraint_definition
 import requests
 import logging
 from datetime import datetime
-import base64
 import json
+from psycopg2.errors import UniqueViolation
+from psycopg2.extras import execute_values
 
 _logger = logging.getLogger(__name__)
 
+# Number of orders requested per ShipStation page (API maximum is 500)
+SHIPSTATION_PAGE_SIZE = 500
+# Number of new orders inserted per create() call during an import
+IMPORT_CREATE_BATCH_SIZE = 100
+# Attempts to import a page whose orders are being imported concurrently
+IMPORT_PAGE_ATTEMPTS = 2
+# Datetime format used by ShipStation for modifyDateStart and friends
+SHIPSTATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Orders handled per query when backfilling columns/lines of existing orders
+BACKFILL_BATCH_SIZE = 1000
+# Last lines of the shipping_address text built by _prepare_order_values:
+# ShipStation sends uppercase two-letter country codes. Postal codes are 3 to
+# 10 characters with a digit and at most one space or hyphen; each part holds
+# a digit or is 2-3 capital letters (e.g. "12345-6789", "SW1A 1AA", "1234 AB",
+# "VLT 1117"), which street lines like "1 Main" or "100 Elm" are not.
+SHIP_COUNTRY_RE = re.compile(r"^[A-Z]{2}$")
+SHIP_POSTAL_CODE_RE = re.compile(
+    r"^(?=.{3,10}$)(?=.*\d)"
+    r"(?:[A-Za-z0-9]*\d[A-Za-z0-9]*|[A-Z]{2,3})"
+    r"(?:[ -](?:[A-Za-z0-9]*\d[A-Za-z0-9]*|[A-Z]{2,3}))?$"
+)
+# Order line fields shown by the api_product_item_table template
+ITEM_TABLE_LINE_FIELDS = ["sequence", "sku", "name", "quantity", "unit_price", "image_url", "options"]
+
+# Rendered item tables keyed by (dbname, lang, template write_date, hash of
+# the line values), kept apart from the registry ormcache so that browsing
+# orders doesn't evict framework entries
+_item_table_cache = LRU(1024)
+
 
 class ApiProduct(models.Model):
     _inherit = "api.product"
 
     item_details = fields.Text(string="Item Details JSON")
+    line_ids = fields.One2many("api.product.line", "product_id", string="Items")
     parsed_items = fields.Html(string="All Items", compute="_compute_parsed_items")
     source_id = fields.Many2one(
         "inventory.admin.settings",
@@ -30,86 +66,49 @@ class ApiProduct(models.Model):
         index=True,
     )
 
-    @api.depends("item_details")
+    _sql_constraints = [
+        (
+            "source_order_number_uniq",
+            "unique(source_id, order_number)",
+            "An order can only be imported once per API source.",
+        ),
+    ]
+
+    def _register_hook(self):
+        super()._register_hook()
+        # Concurrent imports rely on this key to never create an order twice,
+        # see fetch_from_source
+        if not constraint_definition(self.env.cr, self._table, f"{self._table}_source_order_number_uniq"):
+            _logger.error(
+                "The unique (source_id, order_number) key of api_product is missing, "
+                "concurrent imports can create duplicate orders; remove the duplicates "
+                "and update the inventory_button module"
+            )
+
+    @api.depends(*(f"line_ids.{name}" for name in ITEM_TABLE_LINE_FIELDS))
     def _compute_parsed_items(self):
-        """Parse the item_details JSON and format it as HTML for display with clickable images."""
+        """Render the order items as an HTML table with clickable images
+
+        Only computed when the field is read (i.e. by the form view). The HTML
+        is cached by a hash of the displayed line values, so reopening an order
+        doesn't render it again and edited lines are rendered anew.
+        """
+        # Rendered HTML depends on the language and on the template version
+        template = self.env.ref("inventory_button.api_product_item_table").sudo()
+        cache_prefix = (self.env.cr.dbname, self.env.lang, template.write_date)
         for record in self:
-            html_content = """
-            <table class="table table-sm table-striped">
-              <thead>
-                <tr>
-                  <th>Image</th>
-                  <th>SKU</th>
-                  <th>Name</th>
-                  <th>Quantity</th>
-                  <th>Unit Price</th>
-                  <th>Options</th>
-                </tr>
-              </thead>
-              <tbody>
-            """
-
-            if record.item_details:
-                try:
-                    items = json.loads(record.item_details)
-                    for item in items:
-                        sku = item.get("sku", "")
-                        name = item.get("name", "")
-                        quantity = item.get("quantity", 0)
-                        unit_price = item.get("unitPrice", 0)
-
-                        # Clickable thumbnail
-                        image_url = item.get("imageUrl", "")
-                        if image_url:
-                            image_html = f"""
-                            <a href="{image_url}" target="_blank">
-                              <img
-                                src="{image_url}"
-                                alt="Product Image"
-                                style="max-width: 150px; max-height: 150px; object-fit: contain;"
-                                onerror='this.src="/inventory_button/static/img/placeholder.png";'
-                              />
-                            </a>
-                            """
-                        else:
-                            image_html = "No image"
-
-                        # Format options list
-                        options_html = ""
-                        if item.get("options"):
-                            options_html = "<ul class='mb-0'>"
-                            for option in item["options"]:
-                                name_opt = option.get("name", "")
-                                value_opt = option.get("value", "")
-                                if name_opt and value_opt:
-                                    options_html += f"<li><strong>{name_opt}:</strong> {value_opt}</li>"
-                            options_html += "</ul>"
-
-                        # Append row
-                        html_content += (
-                            "<tr>"
-                            f"<td>{image_html}</td>"
-                            f"<td>{sku}</td>"
-                            f"<td>{name}</td>"
-                            f"<td>{quantity}</td>"
-                            f"<td>${unit_price}</td>"
-                            f"<td>{options_html}</td>"
-                            "</tr>"
-                        )
-                except Exception as e:
-                    _logger.error(
-                        f"Error parsing item_details for record {record.id}: {e}"
-                    )
-                    html_content += (
-                        f"<tr><td colspan='6'>Error parsing items: {e}</td></tr>"
-                    )
-            else:
-                html_content += (
-                    "<tr><td colspan='6'>No item details available</td></tr>"
+            lines = record.line_ids
+            line_values = [
+                tuple(line[name] for name in ITEM_TABLE_LINE_FIELDS) for line in lines
+            ]
+            cache_key = cache_prefix + (hashlib.sha1(repr(line_values).encode()).hexdigest(),)
+            html = _item_table_cache.get(cache_key)
+            if html is None:
+                html = self.env["ir.qweb"]._render(
+                    "inventory_button.api_product_item_table", {"lines": lines}
                 )
-
-            html_content += "</tbody></table>"
-            record.parsed_items = html_content
+                _item_table_cache[cache_key] = html
+            record.parsed_items = html
 
     @api.model
     def process_webhook_data(self, webhook_data):
@@ -199,25 +198,15 @@ class ApiProduct(models.Model):
 
             if resource_type == "ORDER_NOTIFY":
                 # This is a notification about an order change, fetch the latest orders
-                # Get all users who should receive notifications (users with inventory access)
+                # Notify all users with inventory access with a single bus write
                 message_util = self.env["inventory_button.send_message"]
-
-                # Find all active users to notify
-                users = self.env["res.users"].search([("active", "=", True)])
-                notification_sent = False
-
-                for user in users:
-                    if user.partner_id:
-                        # Send notification to each user with a valid partner
-                        message_util.send_notification(
-                            user.partner_id,
-                            f"ShipStation Order Notification - {source.name}",
-                            f"New order notification received from ShipStation source: {source.name}.",
-                            sticky=False,
-                            message_type="info",
-                        )
-                        notification_sent = True
-                        _logger.info(f"Sent notification to user: {user.name}")
+                notification_sent = message_util.send_group_notification(
+                    "stock.group_stock_user",
+                    f"ShipStation Order Notification - {source.name}",
+                    f"New order notification received from ShipStation source: {source.name}.",
+                    sticky=False,
+                    message_type="info",
+                )
 
                 if notification_sent:
                     _logger.info("Successfully sent ORDER_NOTIFY webhook notifications")
@@ -255,489 +244,765 @@ class ApiProduct(models.Model):
         else:
             return self.fetch_and_store_api_data()
 
-    @api.model
-    def fetch_from_source(self, source, import_batch=None, filter_status=True):
-        """Fetch data from a specific ShipStation API source"""
-        if not source:
-            _logger.error("No source provided for API fetch")
-            return {
-                "type": "ir.actions.client",
-                "tag": "display_notification",
-                "params": {
-                    "title": "API Fetch Error",
-                    "message": "No source provided for API fetch",
-                    "sticky": False,
-                    "type": "danger",
-                },
-            }
+    def _iter_order_pages(self, source, url, params):
+        """Yield ShipStation order listings one page at a time.
 
-        try:
-            # Use API credentials from the provided source
-            api_key = source.api_key
-            api_secret = source.api_secret
-            url = source.api_url or "https://ssapi.shipstation.com/orders"
-            source_id = source.id
-            source_identifier = source.source_identifier
-
-            if not api_key or not api_secret:
-                _logger.error(f"Missing API credentials for source: {source.name}")
-                return {
-                    "type": "ir.actions.client",
-                    "tag": "display_notification",
-                    "params": {
-                        "title": "API Connection Error",
-                        "message": f"Missing API credentials for source: {source.name}",
-                        "sticky": True,
-                        "type": "danger",
-                    },
-                }
-
-            # Create authorization string (API Key:API Secret) and encode verlae it in Base64
-            auth_string = f"{api_key}:{api_secret}"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                "Authorization": f"Basic {encoded_auth}",
-                "Content-Type": "application/json",
-            }
-
-            # API parameters
-            params = {
-                "pageSize": 500,
-                "sortBy": "OrderDate",
-                "sortDir": "DESC",
-            }
-
-            # Apply orderStatus filter only if filter_status is True
-            if filter_status:
-                params["orderStatus"] = "awaiting_shipment"
-                status_desc = "awaiting shipment orders"
-            else:
-                status_desc = "all orders (all statuses)"
-
-            # If we have an import batch ID from the webhook, add it to the parameters
-            if import_batch:
-                params["importBatch"] = import_batch
-                _logger.info(f"Filtering by import batch: {import_batch}")
+        ShipStation paginates ``/orders`` and reports the total number of pages
+        in the ``pages`` field of every response, so this generator keeps
+        requesting pages until that count is reached.
 
+        :return: generator of ``(page, pages, orders)`` tuples
+        """
+        client = source._get_shipstation_client()
+        page = 1
+        while True:
+            page_params = dict(params, page=page)
             _logger.info(
-                f"Trying to connect to ShipStation API at: {url} for source: {source.name} to fetch {status_desc}"
+                f"Requesting page {page} from ShipStation for source: {source.name}"
             )
-            _logger.info(f"API parameters: {params}")
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = client.get(url, params=page_params, timeout=30)
 
-            if response.status_code == 200:
-                _logger.info(
-                    f"Successfully connected to ShipStation API for source: {source.name}"
-                )
-                # Update the last fetch time in admin settings
-                source.update_last_fetch()
-            else:
+            if response.status_code != 200:
                 _logger.error(
-                    f"API returned status code: {response.status_code} for source: {source.name}"
+                    f"API returned status code: {response.status_code} for source: {source.name} (page {page})"
                 )
                 raise ValueError(
                     f"Could not connect to API endpoint: {response.status_code}"
                 )
 
-            # Parse JSON response
             api_data = response.json()
+            if "orders" not in api_data:
+                raise ValueError(
+                    "Invalid response format from ShipStation API: 'orders' array not found"
+                )
 
-            # Log detailed response information
-            orders_count = len(api_data.get("orders", []))
+            pages = api_data.get("pages") or 1
             _logger.info(
-                f"API response received with {orders_count} {status_desc} for source: {source.name}"
+                f"API response received with {len(api_data['orders'])} orders on page {page}/{pages} for source: {source.name}"
             )
+            yield page, pages, api_data["orders"]
 
-            # If no orders found, log the full response for debugging (limited to prevent huge logs)
-            if orders_count == 0:
-                # Log first 500 chars of the response to avoid overly large logs
-                response_preview = str(api_data)[:500] + (
-                    "..." if len(str(api_data)) > 500 else ""
-                )
-                _logger.info(
-                    f"API response preview for source {source.name}: {response_preview}"
-                )
+            if page >= pages:
+                break
+            page += 1
 
-        except (requests.exceptions.RequestException, ValueError) as e:
-            _logger.error(
-                f"Could not connect to API for source {source.name}: {str(e)}"
-            )
+    @api.model
+    def _parse_modify_date(self, value):
+        """Parse a ShipStation modifyDate (e.g. 2015-06-29T08:46:27.0000000)"""
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+        except (ValueError, TypeError):
+            _logger.warning(f"Could not parse modify date {value}")
+            return None
+
+    @api.model
+    def fetch_from_source(
+        self, source, import_batch=None, filter_status=True, full_resync=False
+    ):
+        """Fetch data from a specific ShipStation API source
+
+        All result pages are walked and every page is imported and committed on
+        its own, so memory stays flat and a failure on a late page keeps the
+        orders imported from the earlier ones.
+
+        Regular awaiting-shipment syncs are incremental: only orders modified
+        since the source's high-water mark are requested. ``full_resync``
+        ignores the mark and downloads the whole window again.
+        """
+        if not source:
+            _logger.error("No source provided for API fetch")
             return {
                 "type": "ir.actions.client",
                 "tag": "display_notification",
                 "params": {
-                    "title": f"API Connection Error - {source.name}",
-                    "message": f"Could not connect to ShipStation API: {str(e)}",
+                    "title": "API Fetch Error",
+                    "message": "No source provided for API fetch",
+                    "sticky": False,
+                    "type": "danger",
+                },
+            }
+
+        # Use API credentials from the provided source
+        api_key = source.api_key
+        api_secret = source.api_secret
+        url = source.api_url or "https://ssapi.shipstation.com/orders"
+        source_name = source.name
+
+        if not api_key or not api_secret:
+            _logger.error(f"Missing API credentials for source: {source_name}")
+            return {
+                "type": "ir.actions.client",
+                "tag": "display_notification",
+                "params": {
+                    "title": "API Connection Error",
+                    "message": f"Missing API credentials for source: {source_name}",
                     "sticky": True,
                     "type": "danger",
                 },
             }
 
-        if "orders" in api_data:
-            try:
-                # Track how many products were added and updated
-                added_count = 0
-                updated_count = 0
-                orders_processed = 0
-
-                # Dictionary to track unique store IDs
-                unique_store_ids = {}
-
-                # First, get all order numbers from the API response for efficient batch lookup
-                order_numbers = [
-                    order.get("orderNumber")
-                    for order in api_data["orders"]
-                    if order.get("orderNumber")
-                ]
-
-                # Find all existing orders from this source in a single database query
-                existing_orders = (
-                    {
-                        record.order_number: record
-                        for record in self.search(
-                            [
-                                ("order_number", "in", order_numbers),
-                                ("source_id", "=", source_id),
-                            ]
-                        )
-                    }
-                    if order_numbers
-                    else {}
+        # API parameters
+        params = {
+            "pageSize": SHIPSTATION_PAGE_SIZE,
+            "sortBy": "OrderDate",
+            "sortDir": "DESC",
+        }
+
+        # Only the regular awaiting-shipment sync maintains the high-water mark;
+        # batch-specific and all-status fetches are one-off downloads
+        track_modify_date = filter_status and not import_batch
+        if track_modify_date:
+            # Oldest modifications first, so the mark can advance page by page
+            params["sortBy"] = "ModifyDate"
+            params["sortDir"] = "ASC"
+            if source.last_sync_modify_date and not full_resync:
+                params["modifyDateStart"] = source.last_sync_modify_date.strftime(
+                    SHIPSTATION_DATETIME_FORMAT
                 )
-
                 _logger.info(
-                    f"Found {len(existing_orders)} existing orders in database for source: {source.name}"
+                    f"Incremental sync for source {source_name}: orders modified since {params['modifyDateStart']}"
                 )
+            else:
+                _logger.info(f"Full sync for source: {source_name}")
 
-                for order in api_data["orders"]:
-                    orders_processed += 1
-                    order_id = order.get("orderId")
-                    order_number = order.get("orderNumber")
-                    order_status = order.get("orderStatus", "")
-
-                    # Extract store_id from advancedOptions object
-                    advanced_options = order.get("advancedOptions", {})
-                    store_id = int(advanced_options["storeId"])
-
-                    # Track unique store IDs and their names
-                    if store_id and store_id not in unique_store_ids:
-                        store_name = order.get("storeName", "")
-                        unique_store_ids[store_id] = {
-                            "storeId": store_id,
-                            "storeName": store_name,
-                        }
+        # Apply orderStatus filter only if filter_status is True
+        if filter_status:
+            params["orderStatus"] = "awaiting_shipment"
+            status_desc = "awaiting shipment orders"
+        else:
+            status_desc = "all orders (all statuses)"
 
-                    # Check if this order already exists for this source
-                    existing_product = existing_orders.get(order_number)
+        # If we have an import batch ID from the webhook, add it to the parameters
+        if import_batch:
+            params["importBatch"] = import_batch
+            _logger.info(f"Filtering by import batch: {import_batch}")
 
-                    # If order exists, only update the status if it has changed
-                    if existing_product:
-                        if existing_product.order_status != order_status:
-                            _logger.info(
-                                f"Order {order_number} status changed: {existing_product.order_status} → {order_status} for source: {source.name}"
-                            )
-                            existing_product.write({"order_status": order_status})
-                            updated_count += 1
-                        else:
-                            _logger.info(
-                                f"Order {order_number} status unchanged ({order_status}), skipping for source: {source.name}"
-                            )
-                        continue  # Skip further processing of this order
+        _logger.info(
+            f"Trying to connect to ShipStation API at: {url} for source: {source_name} to fetch {status_desc}"
+        )
+        _logger.info(f"API parameters: {params}")
+
+        # Never commit from inside a test transaction
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+
+        # Track how many products were added and updated
+        added_count = 0
+        updated_count = 0
+        orders_processed = 0
+        pages_imported = 0
+
+        # Dictionary to track unique store IDs
+        unique_store_ids = {}
 
-                    # Continue with processing only for new orders
+        try:
+            for page, pages, orders in self._iter_order_pages(source, url, params):
+                if page == 1:
                     _logger.info(
-                        f"New order {order_number}, processing for source: {source.name}..."
+                        f"Successfully connected to ShipStation API for source: {source_name}"
                     )
-
-                    # Get items count in order for logging
-                    all_items = order.get("items", [])
-                    items_count = len(all_items)
-                    _logger.info(f"Order {order_number} contains {items_count} items")
-
-                    # Use all items without filtering out discounts
-                    items = all_items
-                    if not items:
-                        _logger.info(f"Order {order_number} has no items")
-                        continue
-
-                    main_item = None
-                    for item in items:
-                        if item.get("lineItemKey") != "Discount":
-                            main_item = item
-                            break
-
-                    # If no non-discount items found, use the first item
-                    if not main_item and items:
-                        main_item = items[0]
-
-                    # If there are no items at all, skip this order
-                    if not main_item:
-                        _logger.info(
-                            f"Order {order_number} has no valid items to use as main item"
-                        )
-                        continue
-
-                    api_id = main_item.get("orderItemId")
-
-                    # Store all items as JSON for reference
-                    item_details_json = json.dumps(items)
-
-                    # Order date handling
-                    order_date_str = order.get("orderDate")
-                    order_date = False
-                    if order_date_str:
-                        try:
-                            # Parse ISO format datetime - extract just the date part
-                            date_part = order_date_str.split("T")[0]
-                            dt = datetime.strptime(date_part, "%Y-%m-%d")
-                            order_date = dt.date()
-                        except (ValueError, TypeError, IndexError) as e:
-                            _logger.warning(
-                                f"Could not parse date {order_date_str}: {e}"
-                            )
-                            # Fall back to storing the raw string
-                            order_date = order_date_str
-
-                    # Ship by date handling
-                    ship_by_date_str = order.get("shipByDate")
-                    ship_by_date = False
-                    if ship_by_date_str and order.get("orderStatus") != "cancelled":
-                        try:
-                            # Parse ISO format datetime - extract just the date part
-                            date_part = ship_by_date_str.split("T")[0]
-                            dt = datetime.strptime(date_part, "%Y-%m-%d")
-                            ship_by_date = dt.date()
-                        except (ValueError, TypeError, IndexError) as e:
-                            _logger.warning(
-                                f"Could not parse ship by date {ship_by_date_str}: {e}"
+                    # Update the last fetch time in admin settings
+                    source.update_last_fetch()
+
+                # Import the page atomically: a failure only rolls back this page
+                for attempt in range(IMPORT_PAGE_ATTEMPTS):
+                    try:
+                        with self.env.cr.savepoint():
+                            page_added, page_updated = self._import_source_page(
+                                source, orders, unique_store_ids, track_modify_date
                             )
-                            # Fall back to storing the raw string
-                            ship_by_date = ship_by_date_str
-
-                    # Get shipping address information
-                    ship_to = order.get("shipTo", {})
-                    shipping_address = ""
-                    if ship_to:
-                        address_parts = []
-                        if ship_to.get("name"):
-                            address_parts.append(ship_to.get("name"))
-                        if ship_to.get("company"):
-                            address_parts.append(ship_to.get("company"))
-                        if ship_to.get("street1"):
-                            address_parts.append(ship_to.get("street1"))
-                        if ship_to.get("street2"):
-                            address_parts.append(ship_to.get("street2"))
-                        if ship_to.get("city"):
-                            city_state = []
-                            city_state.append(ship_to.get("city"))
-                            if ship_to.get("state"):
-                                city_state.append(ship_to.get("state"))
-                            address_parts.append(", ".join(filter(None, city_state)))
-                        if ship_to.get("postalCode"):
-                            address_parts.append(ship_to.get("postalCode"))
-                        if ship_to.get("country"):
-                            address_parts.append(ship_to.get("country"))
-                        shipping_address = "\n".join(filter(None, address_parts))
-
-                    # Extract customer email and payment details
-                    customer_email = order.get("customerEmail", "")
-                    order_total = order.get("orderTotal", 0.0)
-                    amount_paid = order.get("amountPaid", 0.0)
-                    shipping_amount = order.get("shippingAmount", 0.0)
-                    tax_amount = order.get("taxAmount", 0.0)
-                    payment_method = order.get("paymentMethod", "")
-
-                    # Check if this is a rush order based on shipping service
-                    shipping_service = order.get("requestedShippingService", "")
-                    fast_ship = False
-                    if shipping_service:
-                        shipping_service_lower = shipping_service.lower()
-                        fast_ship = (
-                            "expedited" in shipping_service_lower
-                            or "priority" in shipping_service_lower
-                            or "express" in shipping_service_lower
-                        )
-                        _logger.debug(
-                            f"Shipping service: {shipping_service}, fast ship: {fast_ship}"
+                        break
+                    except UniqueViolation:
+                        # Another import (e.g. a webhook for the same source)
+                        # committed some of these orders after this transaction
+                        # started. They only become visible to a new
+                        # transaction, so commit and import the page again.
+                        if not auto_commit or attempt == IMPORT_PAGE_ATTEMPTS - 1:
+                            raise
+                        _logger.info(
+                            f"Orders of page {page} were imported concurrently for source {source_name}, retrying the page"
                         )
+                        self.env.cr.commit()
 
-                    # Get customer notes
-                    customer_notes = order.get("customerNotes", "")
-                    notes = customer_notes
-                    if order.get("internalNotes"):
-                        if notes:
-                            notes += "\n\n"
-                        notes += f"Internal: {order.get('internalNotes')}"
-
-                    # We already got these from main_item earlier
-                    sku = main_item.get("sku", "")
-                    product_name = main_item.get("name", "")
-                    image_url = main_item.get("imageUrl", "")
-
-                    _logger.info(f"Using main item: SKU={sku}, Product={product_name}")
-
-                    # Determine total quantity across all items
-                    total_quantity = sum(item.get("quantity", 0) for item in items)
-
-                    # Extract options from the main item
-                    options = main_item.get("options", [])
-
-                    # Create a dictionary to store all options dynamically
-                    item_options = {}
-
-                    # Process all options from ShipStation response
-                    for option in options:
-                        option_name = option.get("name", "")
-                        option_value = option.get("value", "")
-                        if option_name and option_value:
-                            item_options[option_name.lower()] = option_value
-
-                    # Simply use the already parsed ship_by_date as delivery_date
-                    delivery_date = ship_by_date
-
-                    # Include source information in the product name for easy identification
-                    display_name = f"{sku or product_name[:30]} [{source.name}]"
-
-                    # Prepare values for create with all the fields
-                    product_values = {
-                        "api_id": api_id,
-                        "name": display_name,
-                        "date": order_date,
-                        "design": sku,  # Using SKU as design identifier
-                        "fast_ship": fast_ship,
-                        "quantity": total_quantity,
-                        "email": customer_email,
-                        "notes": notes,
-                        "photo_url": image_url,
-                        "delivery_date": delivery_date,
-                        "address": shipping_address,
-                        # ShipStation specific fields
-                        "order_id": order_id,
-                        "order_number": order_number,
-                        "order_date": order_date,
-                        "ship_by_date": ship_by_date,
-                        "order_status": order_status,
-                        "customer_email": customer_email,
-                        "item_details": item_details_json,
-                        "sku": sku,
-                        "store_id": store_id,
-                        "image_url": image_url,
-                        "product_name": product_name,
-                        "customer_notes": customer_notes,
-                        "shipping_service": shipping_service,
-                        "order_total": order_total,
-                        "amount_paid": amount_paid,
-                        "shipping_amount": shipping_amount,
-                        "tax_amount": tax_amount,
-                        "shipping_address": shipping_address,
-                        "payment_method": payment_method,
-                        # Source information
-                        "source_id": source_id,
-                        "design_price": 0.0,
-                    }
-
-                    # Create new product - no need for condition since we already checked
-                    _logger.info(
-                        f"Creating new product for order {order_number} from source: {source.name}"
-                    )
-                    api_product = self.create(product_values)
-                    _logger.info(
-                        f"Created API product: {api_product.name}, ID: {api_product.api_id}, Order: {order_number}, Source: {source.name}"
-                    )
-                    added_count += 1
-
-                # Update the orders count on the source
-                if added_count > 0:
-                    source.increment_orders_count(added_count)
-
-                # Store the collected store IDs in the source settings
-                if unique_store_ids:
-                    # Check if the source already has store data
-                    existing_stores = []
-                    if source.store_ids_data:
-                        try:
-                            existing_stores = json.loads(source.store_ids_data)
-                            existing_store_ids = {
-                                store["storeId"] for store in existing_stores
-                            }
-
-                            # Add any new stores found
-                            for store_id, store_info in unique_store_ids.items():
-                                if store_id not in existing_store_ids:
-                                    # If we don't have a store name, try to fetch it
-                                    if not store_info["storeName"]:
-                                        store_details = source.fetch_store_by_id(
-                                            store_id
-                                        )
-                                        if store_details and store_details.get(
-                                            "storeName"
-                                        ):
-                                            store_info["storeName"] = store_details.get(
-                                                "storeName"
-                                            )
-                                    existing_stores.append(store_info)
-                                    _logger.info(
-                                        f"Added new store to source {source.name}: ID={store_id}, Name={store_info['storeName']}"
-                                    )
-                        except (ValueError, json.JSONDecodeError):
-                            # Invalid JSON, replace with new data
-                            existing_stores = list(unique_store_ids.values())
-                    else:
-                        # No existing store data, use the new data
-                        existing_stores = list(unique_store_ids.values())
+                added_count += page_added
+                updated_count += page_updated
+                orders_processed += len(orders)
+                pages_imported = page
 
-                    # Update the source with the updated store data
-                    source.write({"store_ids_data": json.dumps(existing_stores)})
-                    _logger.info(
-                        f"Updated store information for source {source.name}: {len(existing_stores)} stores"
-                    )
+                if auto_commit:
+                    self.env.cr.commit()
+                    # Drop the records of this page from the cache to keep memory flat
+                    self.env.invalidate_all()
 
-                # Update success message to show more detailed counts
-                message = (
-                    f"ShipStation orders processed from {source.name}: {orders_processed}. "
-                    f"Products: {added_count} added, {updated_count} updated (status changed)."
+        except (requests.exceptions.RequestException, ValueError) as e:
+            _logger.error(f"Could not connect to API for source {source_name}: {str(e)}")
+            self._update_source_stores(source, unique_store_ids)
+            message = f"Could not connect to ShipStation API: {str(e)}"
+            if pages_imported:
+                message += (
+                    f" {pages_imported} page(s) with {orders_processed} orders were imported before the error "
+                    f"({added_count} added, {updated_count} updated)."
                 )
-                if orders_processed == 0:
-                    message += " No orders found for this import batch."
-
-                _logger.info(message)
-                return {
-                    "type": "ir.actions.client",
-                    "tag": "display_notification",
-                    "params": {
-                        "title": f"API Import - {source.name}",
-                        "message": message,
-                        "sticky": False,
-                        "type": "success" if orders_processed > 0 else "warning",
-                    },
-                }
-            except Exception as e:
-                _logger.error(
-                    f"Error in fetch_from_source for {source.name}: {e}", exc_info=True
+            return {
+                "type": "ir.actions.client",
+                "tag": "display_notification",
+                "params": {
+                    "title": f"API Connection Error - {source_name}",
+                    "message": message,
+                    "sticky": True,
+                    "type": "danger",
+                },
+            }
+        except Exception as e:
+            _logger.error(
+                f"Error in fetch_from_source for {source_name}: {e}", exc_info=True
+            )
+            self._update_source_stores(source, unique_store_ids)
+            message = f"Error processing API data: {str(e)}"
+            if pages_imported:
+                message += (
+                    f" {pages_imported} page(s) with {orders_processed} orders were imported before the error "
+                    f"({added_count} added, {updated_count} updated)."
                 )
-                return {
-                    "type": "ir.actions.client",
-                    "tag": "display_notification",
-                    "params": {
-                        "title": f"Error - {source.name}",
-                        "message": f"Error processing API data: {str(e)}",
-                        "sticky": False,
-                        "type": "danger",
-                    },
-                }
-        else:
             return {
                 "type": "ir.actions.client",
                 "tag": "display_notification",
                 "params": {
-                    "title": f"API Error - {source.name}",
-                    "message": "Invalid response format from ShipStation API: 'orders' array not found",
+                    "title": f"Error - {source_name}",
+                    "message": message,
                     "sticky": False,
                     "type": "danger",
                 },
             }
 
+        # Store the collected store IDs in the source settings
+        self._update_source_stores(source, unique_store_ids)
+
+        # Update success message to show more detailed counts
+        message = (
+            f"ShipStation orders processed from {source_name}: {orders_processed}. "
+            f"Products: {added_count} added, {updated_count} updated (status changed)."
+        )
+        if orders_processed == 0:
+            message += " No orders found for this import batch."
+
+        _logger.info(message)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": f"API Import - {source_name}",
+                "message": message,
+                "sticky": False,
+                "type": "success" if orders_processed > 0 else "warning",
+            },
+        }
+
+    def _import_source_page(self, source, orders, unique_store_ids, track_modify_date):
+        """Import one page of orders and update the source's counters
+
+        :return: tuple ``(added_count, updated_count)``
+        """
+        page_added, page_updated = self._import_orders_page(source, orders, unique_store_ids)
+        # Update the orders count on the source
+        if page_added > 0:
+            source.increment_orders_count(page_added)
+
+        # Advance the high-water mark together with the page data
+        if track_modify_date:
+            page_modify_dates = [
+                modify_date
+                for modify_date in map(
+                    self._parse_modify_date,
+                    (order.get("modifyDate") for order in orders),
+                )
+                if modify_date
+            ]
+            if page_modify_dates:
+                source.update_last_sync_modify_date(max(page_modify_dates))
+        return page_added, page_updated
+
+    def _import_orders_page(self, source, orders, unique_store_ids):
+        """Import one page of ShipStation orders for the given source
+
+        New orders are created and existing ones only get their status updated.
+        Store IDs seen on the page are collected into ``unique_store_ids``.
+
+        :return: tuple ``(added_count, updated_count)``
+        """
+        added_count = 0
+        updated_count = 0
+
+        # First, get all order numbers from the page for efficient batch lookup
+        order_numbers = [
+            order.get("orderNumber") for order in orders if order.get("orderNumber")
+        ]
+
+        # Find all existing orders from this source in a single database query
+        existing_orders = (
+            {
+                record.order_number: record
+                for record in self.search(
+                    [
+                        ("order_number", "in", order_numbers),
+                        ("source_id", "=", source.id),
+                    ]
+                )
+            }
+            if order_numbers
+            else {}
+        )
+
+        _logger.info(
+            f"Found {len(existing_orders)} existing orders in database for source: {source.name}"
+        )
+
+        # Values of the new orders, created in batches once the page is parsed
+        new_values = []
+        # New status of the existing orders whose status changed, by order id
+        status_changes = {}
+        seen_order_numbers = set()
+
+        for order in orders:
+            order_number = order.get("orderNumber")
+            order_status = order.get("orderStatus", "")
+
+            # Extract store_id from advancedOptions object
+            advanced_options = order.get("advancedOptions", {})
+            store_id = int(advanced_options["storeId"])
+
+            # Track unique store IDs and their names
+            if store_id and store_id not in unique_store_ids:
+                store_name = order.get("storeName", "")
+                unique_store_ids[store_id] = {
+                    "storeId": store_id,
+                    "storeName": store_name,
+                }
+
+            # Check if this order already exists for this source
+            existing_product = existing_orders.get(order_number)
+
+            # If order exists, only update the status if it has changed
+            if existing_product:
+                if existing_product.order_status != order_status:
+                    _logger.info(
+                        f"Order {order_number} status changed: {existing_product.order_status} → {order_status} for source: {source.name}"
+                    )
+                    status_changes[existing_product.id] = order_status
+                else:
+                    _logger.info(
+                        f"Order {order_number} status unchanged ({order_status}), skipping for source: {source.name}"
+                    )
+                continue  # Skip further processing of this order
+
+            # The same order can't be created twice from one page
+            if order_number in seen_order_numbers:
+                continue
+
+            # Continue with processing only for new orders
+            _logger.info(
+                f"New order {order_number}, processing for source: {source.name}..."
+            )
+
+            product_values = self._prepare_order_values(source, order)
+            if not product_values:
+                continue
+
+            seen_order_numbers.add(order_number)
+            new_values.append(product_values)
+
+        # One write per new status instead of one per order
+        product_ids_by_status = {}
+        for product_id, order_status in status_changes.items():
+            product_ids_by_status.setdefault(order_status, []).append(product_id)
+        for order_status, product_ids in product_ids_by_status.items():
+            self.browse(product_ids).write({"order_status": order_status})
+            updated_count += len(product_ids)
+
+        # Create the new products in batches so followers and stored computes
+        # are handled for a whole batch at once instead of order by order
+        for index in range(0, len(new_values), IMPORT_CREATE_BATCH_SIZE):
+            batch = new_values[index : index + IMPORT_CREATE_BATCH_SIZE]
+            api_products = self.create(batch)
+            _logger.info(
+                f"Created {len(api_products)} API products from source: {source.name} "
+                f"(orders: {', '.join(api_products.mapped('order_number'))})"
+            )
+            added_count += len(api_products)
+
+        return added_count, updated_count
+
+    def _prepare_order_values(self, source, order):
+        """Build the api.product values for a new ShipStation order
+
+        :return: dict of values, or None when the order has no usable items
+        """
+        order_number = order.get("orderNumber")
+        advanced_options = order.get("advancedOptions", {})
+        store_id = int(advanced_options["storeId"])
+
+        # Get items count in order for logging
+        all_items = order.get("items", [])
+        items_count = len(all_items)
+        _logger.info(f"Order {order_number} contains {items_count} items")
+
+        # Use all items without filtering out discounts
+        items = all_items
+        if not items:
+            _logger.info(f"Order {order_number} has no items")
+            return None
+
+        main_item = None
+        for item in items:
+            if item.get("lineItemKey") != "Discount":
+                main_item = item
+                break
+
+        # If no non-discount items found, use the first item
+        if not main_item and items:
+            main_item = items[0]
+
+        # If there are no items at all, skip this order
+        if not main_item:
+            _logger.info(f"Order {order_number} has no valid items to use as main item")
+            return None
+
+        api_id = main_item.get("orderItemId")
+
+        # Store all items as JSON for reference
+        item_details_json = json.dumps(items)
+
+        # Order date handling
+        order_date_str = order.get("orderDate")
+        order_date = False
+        if order_date_str:
+            try:
+                # Parse ISO format datetime - extract just the date part
+                date_part = order_date_str.split("T")[0]
+                dt = datetime.strptime(date_part, "%Y-%m-%d")
+                order_date = dt.date()
+            except (ValueError, TypeError, IndexError) as e:
+                _logger.warning(f"Could not parse date {order_date_str}: {e}")
+                # Fall back to storing the raw string
+                order_date = order_date_str
+
+        # Ship by date handling
+        ship_by_date_str = order.get("shipByDate")
+        ship_by_date = False
+        if ship_by_date_str and order.get("orderStatus") != "cancelled":
+            try:
+                # Parse ISO format datetime - extract just the date part
+                date_part = ship_by_date_str.split("T")[0]
+                dt = datetime.strptime(date_part, "%Y-%m-%d")
+                ship_by_date = dt.date()
+            except (ValueError, TypeError, IndexError) as e:
+                _logger.warning(
+                    f"Could not parse ship by date {ship_by_date_str}: {e}"
+                )
+                # Fall back to storing the raw string
+                ship_by_date = ship_by_date_str
+
+        # Get shipping address information
+        ship_to = order.get("shipTo") or {}
+        shipping_address = ""
+        if ship_to:
+            address_parts = []
+            if ship_to.get("name"):
+                address_parts.append(ship_to.get("name"))
+            if ship_to.get("company"):
+                address_parts.append(ship_to.get("company"))
+            if ship_to.get("street1"):
+                address_parts.append(ship_to.get("street1"))
+            if ship_to.get("street2"):
+                address_parts.append(ship_to.get("street2"))
+            if ship_to.get("city"):
+                city_state = []
+                city_state.append(ship_to.get("city"))
+                if ship_to.get("state"):
+                    city_state.append(ship_to.get("state"))
+                address_parts.append(", ".join(filter(None, city_state)))
+            if ship_to.get("postalCode"):
+                address_parts.append(ship_to.get("postalCode"))
+            if ship_to.get("country"):
+                address_parts.append(ship_to.get("country"))
+            shipping_address = "\n".join(filter(None, address_parts))
+
+        # Extract customer email and payment details
+        customer_email = order.get("customerEmail", "")
+        order_total = order.get("orderTotal", 0.0)
+        amount_paid = order.get("amountPaid", 0.0)
+        shipping_amount = order.get("shippingAmount", 0.0)
+        tax_amount = order.get("taxAmount", 0.0)
+        payment_method = order.get("paymentMethod", "")
+
+        # Check if this is a rush order based on shipping service
+        shipping_service = order.get("requestedShippingService", "")
+        fast_ship = False
+        if shipping_service:
+            shipping_service_lower = shipping_service.lower()
+            fast_ship = (
+                "expedited" in shipping_service_lower
+                or "priority" in shipping_service_lower
+                or "express" in shipping_service_lower
+            )
+            _logger.debug(
+                f"Shipping service: {shipping_service}, fast ship: {fast_ship}"
+            )
+
+        # Get customer notes
+        customer_notes = order.get("customerNotes", "")
+        notes = customer_notes
+        if order.get("internalNotes"):
+            if notes:
+                notes += "\n\n"
+            notes += f"Internal: {order.get('internalNotes')}"
+
+        # We already got these from main_item earlier
+        sku = main_item.get("sku", "")
+        product_name = main_item.get("name", "")
+        image_url = main_item.get("imageUrl", "")
+
+        _logger.info(f"Using main item: SKU={sku}, Product={product_name}")
+
+        # Determine total quantity across all items
+        total_quantity = sum(item.get("quantity", 0) for item in items)
+
+        # Simply use the already parsed ship_by_date as delivery_date
+        delivery_date = ship_by_date
+
+        ApiProductLine = self.env["api.product.line"]
+
+        # Include source information in the product name for easy identification
+        display_name = f"{sku or product_name[:30]} [{source.name}]"
+
+        # Prepare values for create with all the fields
+        return {
+            "api_id": api_id,
+            "name": display_name,
+            "date": order_date,
+            "design": sku,  # Using SKU as design identifier
+            "fast_ship": fast_ship,
+            "quantity": total_quantity,
+            "email": customer_email,
+            "notes": notes,
+            "photo_url": image_url,
+            "delivery_date": delivery_date,
+            "address": shipping_address,
+            # ShipStation specific fields
+            "order_id": order.get("orderId"),
+            "order_number": order_number,
+            "order_date": order_date,
+            "ship_by_date": ship_by_date,
+            "order_status": order.get("orderStatus", ""),
+            "customer_email": customer_email,
+            "item_details": item_details_json,
+            "line_ids": [
+                (0, 0, ApiProductLine._prepare_values_from_item(item, sequence))
+                for sequence, item in enumerate(items, start=1)
+            ],
+            "sku": sku,
+            "store_id": store_id,
+            "image_url": image_url,
+            "product_name": product_name,
+            "customer_notes": customer_notes,
+            "shipping_service": shipping_service,
+            "order_total": order_total,
+            "amount_paid": amount_paid,
+            "shipping_amount": shipping_amount,
+            "tax_amount": tax_amount,
+            "shipping_address": shipping_address,
+            "ship_country": ship_to.get("country") or False,
+            "ship_state": ship_to.get("state") or False,
+            "ship_city": ship_to.get("city") or False,
+            "ship_postal_code": ship_to.get("postalCode") or False,
+            "payment_method": payment_method,
+            # Source information
+            "source_id": source.id,
+            "design_price": 0.0,
+        }
+
+    @api.model
+    def _parse_shipping_address(self, shipping_address):
+        """Split a shipping_address text back into ship_* values
+
+        The text is built by _prepare_order_values with one part per line:
+        name, company, streets, "city, state", postal code and country.
+
+        :return: dict with the ship_* values that could be recognized
+        """
+        lines = [line.strip() for line in (shipping_address or "").split("\n")]
+        lines = [line for line in lines if line]
+
+        # Postal code and country close the text, each of them optional
+        vals = {}
+        if lines and SHIP_COUNTRY_RE.match(lines[-1]):
+            vals["ship_country"] = lines.pop()
+        if not lines or not SHIP_POSTAL_CODE_RE.match(lines[-1]):
+            # Without a postal code the city line can't be told apart from a
+            # name or street line
+            return vals
+        vals["ship_postal_code"] = lines.pop()
+
+        # The line right before the postal code is "city, state" when the
+        # address has a state; without a comma it may be a city or a street,
+        # so leave it
+        city, sep, state = lines[-1].partition(",") if lines else ("", "", "")
+        if sep and "," not in state and city.strip() and state.strip():
+            vals["ship_city"] = city.strip()
+            vals["ship_state"] = state.strip()
+        return vals
+
+    @api.model
+    def _backfill_ship_address_fields(self):
+        """Fill the ship_* columns of orders imported before they existed
+
+        :return: number of orders updated
+        """
+        ship_fields = ["ship_country", "ship_state", "ship_city", "ship_postal_code"]
+        self.flush_model(["shipping_address"] + ship_fields)
+        cr = self.env.cr
+        last_id = 0
+        updated = 0
+        while True:
+            cr.execute(
+                """
+                SELECT id, shipping_address
+                FROM api_product
+                WHERE id > %s
+                  AND shipping_address IS NOT NULL AND shipping_address != ''
+                  AND ship_country IS NULL AND ship_state IS NULL
+                  AND ship_city IS NULL AND ship_postal_code IS NULL
+                ORDER BY id
+                LIMIT %s
+            """,
+                (last_id, BACKFILL_BATCH_SIZE),
+            )
+            rows = cr.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            values = []
+            for product_id, shipping_address in rows:
+                vals = self._parse_shipping_address(shipping_address)
+                if vals:
+                    values.append(
+                        (product_id,) + tuple(vals.get(name) or None for name in ship_fields)
+                    )
+            if values:
+                execute_values(
+                    cr._obj,
+                    """
+                    UPDATE api_product AS p
+                    SET ship_country = v.ship_country,
+                        ship_state = v.ship_state,
+                        ship_city = v.ship_city,
+                        ship_postal_code = v.ship_postal_code
+                    FROM (VALUES %s) AS v(id, ship_country, ship_state, ship_city, ship_postal_code)
+                    WHERE p.id = v.id
+                """,
+                    values,
+                )
+                updated += len(values)
+
+        self.invalidate_model(ship_fields)
+        # The cached lists of shipping states (_get_ship_states) are now outdated
+        self._invalidate_ship_states_cache()
+        _logger.info(f"Backfilled shipping address columns of {updated} orders")
+        return updated
+
+    @api.model
+    def _backfill_product_lines(self):
+        """Create the api.product.line records of orders imported before lines existed
+
+        :return: number of lines created
+        """
+        ApiProductLine = self.env["api.product.line"]
+        self.flush_model(["item_details"])
+        ApiProductLine.flush_model()
+        cr = self.env.cr
+        line_fields = ["sequence", "sku", "name", "quantity", "unit_price", "image_url", "options"]
+        last_id = 0
+        created = 0
+        while True:
+            cr.execute(
+                """
+                SELECT p.id, p.item_details
+                FROM api_product p
+                WHERE p.id > %s
+                  AND p.item_details IS NOT NULL AND p.item_details != ''
+                  AND NOT EXISTS (SELECT 1 FROM api_product_line l WHERE l.product_id = p.id)
+                ORDER BY p.id
+                LIMIT %s
+            """,
+                (last_id, BACKFILL_BATCH_SIZE),
+            )
+            rows = cr.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            values = []
+            for product_id, item_details in rows:
+                try:
+                    items = json.loads(item_details)
+                except ValueError:
+                    _logger.warning(f"Skipping invalid item_details of order {product_id}")
+                    continue
+                if not isinstance(items, list):
+                    continue
+                for sequence, item in enumerate(items, start=1):
+                    vals = ApiProductLine._prepare_values_from_item(item, sequence)
+                    values.append(
+                        (product_id,)
+                        + tuple(None if vals[name] is False else vals[name] for name in line_fields)
+                        + (self.env.uid, self.env.uid)
+                    )
+            if values:
+                execute_values(
+                    cr._obj,
+                    """
+                    INSERT INTO api_product_line (
+                        product_id, sequence, sku, name, quantity, unit_price,
+                        image_url, options, create_uid, write_uid, create_date, write_date
+                    )
+                    VALUES %s
+                """,
+                    values,
+                    template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
+                    "now() at time zone 'UTC', now() at time zone 'UTC')",
+                )
+                created += len(values)
+
+        ApiProductLine.invalidate_model()
+        self.invalidate_model(["line_ids"])
+        _logger.info(f"Backfilled {created} order lines")
+        return created
+
+    def _update_source_stores(self, source, unique_store_ids):
+        """Register the stores seen during an import that the source doesn't know yet"""
+        if not unique_store_ids:
+            return
+
+        known_store_ids = set(source.store_ids.mapped("store_id"))
+        new_stores = []
+        for store_id, store_info in unique_store_ids.items():
+            if store_id in known_store_ids:
+                continue
+            # If we don't have a store name, try to fetch it
+            if not store_info["storeName"]:
+                store_details = source.fetch_store_by_id(store_id)
+                if store_details and store_details.get("storeName"):
+                    store_info["storeName"] = store_details.get("storeName")
+            new_stores.append(store_info)
+            _logger.info(
+                f"Added new store to source {source.name}: ID={store_id}, Name={store_info['storeName']}"
+            )
+
+        if new_stores:
+            self.env["shipstation.store"]._sync_source_stores(source, new_stores)
+
     @api.model
     def fetch_and_store_api_data(self, import_batch=None):
         """Legacy method for backward compatibility, now calls fetch_all_sources"""
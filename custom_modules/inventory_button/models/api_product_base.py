@@ -1,10 +1,20 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 import logging
-import json
 from datetime import timedelta
 
 _logger = logging.getLogger(__name__)
 
+# Default priority weights, overridable in the settings through the
+# inventory_button.priority_weight_<key> system parameters
+PRIORITY_WEIGHTS = {
+    "manual_urgent": 100,
+    "fast_ship": 50,
+    "bulk_order": 20,
+    "design": 10,
+}
+# Orders of more than this many items get the bulk_order weight
+BULK_ORDER_QUANTITY = 10
+
 
 class ApiProduct(models.Model):
     _name = "api.product"
@@ -19,10 +29,12 @@ class ApiProduct(models.Model):
     # ShipStation Order fields - main fields that replace duplicates
     order_id = fields.Integer("Order ID", help="ShipStation order identifier")
     order_number = fields.Char(
-        "Order Number", help="ShipStation order reference number"
+        "Order Number", index=True, help="ShipStation order reference number"
     )
 
-    order_status = fields.Char("Order Status", help="Current status in ShipStation")
+    order_status = fields.Char(
+        "Order Status", index=True, help="Current status in ShipStation"
+    )
     customer_email = fields.Char("Customer Email", help="Customer's email from order")
     item_details = fields.Text(
         "Item Details", help="JSON representation of order items"
@@ -43,9 +55,27 @@ class ApiProduct(models.Model):
     shipping_amount = fields.Float("Shipping Amount", help="Cost of shipping")
     tax_amount = fields.Float("Tax Amount", help="Tax applied to the order")
     shipping_address = fields.Text("Shipping Address", help="Full shipping address")
+    ship_country = fields.Char(
+        "Ship Country", index=True, help="Country code of the shipping address"
+    )
+    ship_state = fields.Char("Ship State", index=True, help="State of the shipping address")
+    ship_city = fields.Char("Ship City", index=True, help="City of the shipping address")
+    ship_postal_code = fields.Char(
+        "Ship Postal Code", index=True, help="Postal code of the shipping address"
+    )
     payment_method = fields.Char("Payment Method", help="Method of payment")
 
-    store_id = fields.Integer("Store ID", help="ID of the store in ShipStation")
+    store_id = fields.Integer(
+        "Store ID", index=True, help="ID of the store in ShipStation"
+    )
+    shipstation_store_id = fields.Many2one(
+        "shipstation.store",
+        string="Store",
+        compute="_compute_shipstation_store_id",
+        store=True,
+        index=True,
+        help="ShipStation store of the order's source",
+    )
     store_name = fields.Char(
         "Store Name",
         compute="_compute_store_name",
@@ -181,6 +211,7 @@ class ApiProduct(models.Model):
         default="all_orders",
         tracking=True,
         readonly=False,
+        index=True,
         group_expand="_read_group_state",
     )
 
@@ -215,51 +246,160 @@ class ApiProduct(models.Model):
         string="Priority", compute="_compute_priority", store=True
     )
 
-    # Field to sort unread messages only for assigned designer
+    # Users for whom the order has unread messages, i.e. its assigned user
+    # while unread_messages is set. The relation table is the per-user unread
+    # index used to sort "my unread orders" first.
+    unread_user_ids = fields.Many2many(
+        "res.users",
+        "api_product_unread_user_rel",
+        "product_id",
+        "user_id",
+        string="Unread By",
+        compute="_compute_unread_user_ids",
+        store=True,
+    )
+    # Field to sort unread messages only for assigned designer, see
+    # _generate_order_by_inner
     user_unread_priority = fields.Integer(
         string="User Unread Priority",
         compute="_compute_user_unread_priority",
-        store=True,
     )
 
     @api.depends("unread_messages", "user_id")
+    def _compute_unread_user_ids(self):
+        for record in self:
+            record.unread_user_ids = record.user_id if record.unread_messages else False
+
+    @api.depends_context("uid")
+    @api.depends("unread_user_ids")
     def _compute_user_unread_priority(self):
         current_user = self.env.user
         for record in self:
             # Set high priority only if unread AND assigned to current user
-            if record.unread_messages and record.user_id.id == current_user.id:
+            if current_user in record.unread_user_ids:
                 record.user_unread_priority = 100
             else:
                 record.user_unread_priority = 0
 
+    def _generate_order_by_inner(self, alias, order_spec, query, reverse_direction=False, seen=None):
+        """Allow sorting on user_unread_priority
+
+        The field depends on the current user so it can't be stored; sort on
+        a lookup of the current user in the unread index instead.
+        """
+        if "user_unread_priority" not in order_spec:
+            return super()._generate_order_by_inner(
+                alias, order_spec, query, reverse_direction=reverse_direction, seen=seen
+            )
+        order_by_elements = []
+        for order_part in order_spec.split(","):
+            words = order_part.strip().split()
+            if not words or words[0] != "user_unread_priority":
+                order_by_elements += super()._generate_order_by_inner(
+                    alias, order_part, query, reverse_direction=reverse_direction, seen=seen
+                )
+                continue
+            direction = words[1].upper() if len(words) > 1 else "ASC"
+            if reverse_direction:
+                direction = "DESC" if direction == "ASC" else "ASC"
+            order_by_elements.append(
+                f"""(CASE WHEN EXISTS (
+                    SELECT 1 FROM api_product_unread_user_rel unread
+                    WHERE unread.product_id = "{alias}".id AND unread.user_id = {int(self.env.uid)}
+                ) THEN 100 ELSE 0 END) {direction}"""
+            )
+        return order_by_elements
+
+    def init(self):
+        super().init()
+        # Designer workload and dashboard filters; these also serve lookups on
+        # designer_id or date alone, so neither field has its own index
+        tools.create_index(
+            self._cr,
+            "api_product_designer_id_state_index",
+            self._table,
+            ["designer_id", "state"],
+        )
+        tools.create_index(
+            self._cr,
+            "api_product_date_state_index",
+            self._table,
+            ["date", "state"],
+        )
+
+    @api.model
+    def _get_priority_weights(self):
+        """Priority weights from the settings
+
+        A weight whose parameter is missing or invalid uses PRIORITY_WEIGHTS;
+        a parameter set to "0" disables that criterion.
+        """
+        get_param = self.env["ir.config_parameter"].sudo().get_param
+        weights = {}
+        for key, default in PRIORITY_WEIGHTS.items():
+            value = get_param(f"inventory_button.priority_weight_{key}")
+            try:
+                weights[key] = int(value) if value else default
+            except ValueError:
+                weights[key] = default
+        return weights
+
     @api.depends("fast_ship", "quantity", "design", "manual_urgent")
     def _compute_priority(self):
+        weights = self._get_priority_weights()
         for record in self:
-            _logger.info(f"Computing priority for record: {record}")
-            # Default priority = 0
             priority = 0
-
-            # Priority 4: Manual Urgent
             if record.manual_urgent:
-                priority += 100
-            # Priority 3 highest: fast_ship
+                priority += weights["manual_urgent"]
             if record.fast_ship:
-                priority += 50
-            # Priority 2: Bulk Order (quantity > 10)
-            if record.quantity > 10:
-                priority += 20
-            # Priority 1: Custom design
+                priority += weights["fast_ship"]
+            if record.quantity > BULK_ORDER_QUANTITY:
+                priority += weights["bulk_order"]
+            # Custom design
             if record.design:
-                priority += 10
-
+                priority += weights["design"]
             record.priority = priority
 
     @api.model
-    def create(self, vals):
-        # Set default state if not provided
-        if "state" not in vals:
-            vals["state"] = "all_orders"
-        return super(ApiProduct, self).create(vals)
+    def _backfill_priority(self):
+        """Recompute the priority of all orders with a single UPDATE
+
+        Same rules as _compute_priority, used after the weights change so
+        that the whole table isn't loaded into the ORM.
+
+        :return: number of orders whose priority changed
+        """
+        weights = self._get_priority_weights()
+        self.flush_model(["fast_ship", "quantity", "design", "manual_urgent", "priority"])
+        self.env.cr.execute(
+            """
+            UPDATE api_product AS p
+            SET priority = v.priority
+            FROM (
+                SELECT id,
+                       CASE WHEN manual_urgent THEN %(manual_urgent)s ELSE 0 END
+                       + CASE WHEN fast_ship THEN %(fast_ship)s ELSE 0 END
+                       + CASE WHEN quantity > %(bulk_quantity)s THEN %(bulk_order)s ELSE 0 END
+                       + CASE WHEN design IS NOT NULL AND design != '' THEN %(design)s ELSE 0 END
+                       AS priority
+                FROM api_product
+            ) AS v
+            WHERE p.id = v.id AND p.priority IS DISTINCT FROM v.priority
+        """,
+            dict(weights, bulk_quantity=BULK_ORDER_QUANTITY),
+        )
+        updated = self.env.cr.rowcount
+        self.invalidate_model(["priority"])
+        _logger.info(f"Recomputed priority of {updated} orders")
+        return updated
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            # Set default state if not provided
+            if "state" not in vals:
+                vals["state"] = "all_orders"
+        return super(ApiProduct, self).create(vals_list)
 
     def toggle_manual_urgent(self):
         for record in self:
@@ -291,33 +431,30 @@ class ApiProduct(models.Model):
             else:
                 record.turnaround_hours = 0.0
 
-    @api.depends("store_id", "source_id", "source_id.store_ids_data")
+    @api.depends("store_id", "source_id")
+    def _compute_shipstation_store_id(self):
+        """Link each order to the store record of its source and store_id
+
+        The stores of all the sources in the recordset are read with a single
+        query and every order is resolved from that map.
+        """
+        Store = self.env["shipstation.store"]
+        stores = Store.sudo().search_read(
+            [("source_id", "in", self.source_id.ids)], ["source_id", "store_id"]
+        )
+        store_map = {(store["source_id"][0], store["store_id"]): store["id"] for store in stores}
+        for record in self:
+            record.shipstation_store_id = Store.browse(
+                store_map.get((record.source_id.id, record.store_id))
+            )
+
+    @api.depends("store_id", "shipstation_store_id.name", "shipstation_store_id.color")
     def _compute_store_name(self):
-        """Look up store name and color from source settings based on store_id"""
+        """Take the store name and color from the linked ShipStation store"""
         for record in self:
-            store_name = (
-                str(record.store_id) if record.store_id else ""
-            )  # Default to ID as string
-            store_color = "#CCCCCC"  # Default gray color
-
-            # Only proceed if we have both source and store_id
-            if record.source_id and record.store_id:
-                if record.source_id.store_ids_data:
-                    try:
-                        stores_data = json.loads(record.source_id.store_ids_data)
-                        # Find store with matching ID
-                        for store in stores_data:
-                            if store.get("storeId") == record.store_id:
-                                store_name = store.get("storeName", "")
-                                store_color = store.get("color", "#CCCCCC")
-                                break
-                    except (json.JSONDecodeError, ValueError) as e:
-                        _logger.warning(
-                            f"Error parsing store data for source {record.source_id.name}: {e}"
-                        )
-
-            record.store_name = store_name or str(record.store_id) or ""
-            record.store_color = store_color
+            store = record.shipstation_store_id
+            record.store_name = store.name or str(record.store_id) or ""
+            record.store_color = store.color or "#CCCCCC"
 
     @api.model
     def get_all_shops(self):
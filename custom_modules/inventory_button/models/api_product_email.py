@@ -1,6 +1,7 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 import logging
 from odoo.exceptions import UserError
+from .reply_classifier import APPROVE, DEVELOP, classify_reply
 
 _logger = logging.getLogger(__name__)
 
@@ -192,35 +193,7 @@ class ApiProduct(models.Model):
                 },
             }
 
-        # Find Administrator partner
-        admin_partner = self.env.ref("base.partner_admin", False)
-
-        # Find or create partner for customer email
-        partner_obj = self.env["res.partner"]
-        customer_partner = partner_obj.search(
-            [("email", "=", self.customer_email)], limit=1
-        )
-
-        if not customer_partner:
-            # Create a new partner for this email
-            customer_name = (
-                self.email.split("@")[0] if "@" in self.customer_email else "Customer"
-            )
-            customer_partner = partner_obj.create(
-                {
-                    "name": customer_name,
-                    "email": self.customer_email,
-                }
-            )
-
-        # Add customer as follower if not already
-        if customer_partner:
-            if customer_partner.id not in self.message_partner_ids.ids:
-                self.message_subscribe(partner_ids=[customer_partner.id])
-
-        # Remove Administrator from followers if present
-        if admin_partner and admin_partner.id in self.message_partner_ids.ids:
-            self.message_unsubscribe(partner_ids=[admin_partner.id])
+        self.sudo()._auto_manage_followers()
 
         return {
             "type": "ir.actions.client",
@@ -233,98 +206,125 @@ class ApiProduct(models.Model):
             },
         }
 
-    @api.model
-    def create(self, vals):
-        """Override create to auto-manage followers when record is created"""
-        record = super(ApiProduct, self).create(vals)
-        # Automatically manage followers if customer_email is present
-        if record.customer_email:
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to auto-manage followers when records are created"""
+        records = super(ApiProduct, self).create(vals_list)
+        # Automatically manage followers for records with a customer_email
+        records_with_email = records.filtered("customer_email")
+        if records_with_email:
             # Call in sudo to ensure we have permissions to modify followers
-            record.sudo()._auto_manage_followers()
-        return record
+            records_with_email.sudo()._auto_manage_followers()
+        return records
 
     def write(self, vals):
         """Override write to auto-manage followers when customer_email is updated"""
         result = super(ApiProduct, self).write(vals)
         # If customer_email is updated, manage followers
         if "customer_email" in vals and vals.get("customer_email"):
-            for record in self:
-                record.sudo()._auto_manage_followers()
+            self.sudo()._auto_manage_followers()
         return result
 
     def _auto_manage_followers(self):
-        """Automatically add customer as follower and remove Administrator"""
-        self.ensure_one()
+        """Automatically add customers as followers and remove Administrator
 
-        if not self.customer_email:
+        Works on the whole recordset: all customer emails are resolved with a
+        single partner search, missing partners are created in one batch, the
+        existing followers are read with one query and the missing follower
+        rows are inserted together.
+        """
+        records = self.filtered("customer_email")
+        if not records:
             return
 
         # Find Administrator partner
         admin_partner = self.env.ref("base.partner_admin", False)
 
-        # Find or create partner for customer email
+        # Find partners for all customer emails at once
         partner_obj = self.env["res.partner"]
-        customer_partner = partner_obj.search(
-            [("email", "=", self.customer_email)], limit=1
-        )
-
-        if not customer_partner:
-            # Create a new partner for this email
-            customer_name = (
-                self.customer_email.split("@")[0]
-                if "@" in self.customer_email
-                else "Customer"
+        emails = set(records.mapped("customer_email"))
+        partner_by_email = partner_obj._find_partners_by_email(emails)
+
+        # Create partners for the emails we don't know yet in one batch,
+        # one per address even if it is spelled differently across orders
+        missing_by_normalized = {}
+        for email in emails:
+            if email not in partner_by_email:
+                normalized = tools.email_normalize(email) or email
+                missing_by_normalized.setdefault(normalized, []).append(email)
+        if missing_by_normalized:
+            new_partners = partner_obj.create(
+                [
+                    {
+                        "name": email_list[0].split("@")[0]
+                        if "@" in email_list[0]
+                        else "Customer",
+                        "email": email_list[0],
+                    }
+                    for email_list in missing_by_normalized.values()
+                ]
             )
-            customer_partner = partner_obj.create(
+            for email_list, partner in zip(missing_by_normalized.values(), new_partners):
+                partner_by_email.update(dict.fromkeys(email_list, partner))
+
+        # Add the missing customer follower rows in one batch, with the
+        # default subtypes message_subscribe would give them
+        Followers = self.env["mail.followers"].sudo()
+        Followers.flush_model()
+        self.env.cr.execute(
+            "SELECT res_id, partner_id FROM mail_followers WHERE res_model = %s AND res_id IN %s",
+            (self._name, tuple(records.ids)),
+        )
+        existing_followers = set(self.env.cr.fetchall())
+        _all, internal_subtypes, external_subtypes = self.env[
+            "mail.message.subtype"
+        ].default_subtypes(self._name)
+
+        follower_values = []
+        for record in records:
+            partner = partner_by_email[record.customer_email]
+            if (record.id, partner.id) in existing_followers:
+                continue
+            existing_followers.add((record.id, partner.id))
+            subtypes = external_subtypes if partner.partner_share else _all
+            follower_values.append(
                 {
-                    "name": customer_name,
-                    "email": self.customer_email,
+                    "res_model": self._name,
+                    "res_id": record.id,
+                    "partner_id": partner.id,
+                    "subtype_ids": [(6, 0, subtypes.ids)],
                 }
             )
-
-        # Add customer as follower if not already
-        if customer_partner:
-            if customer_partner.id not in self.message_partner_ids.ids:
-                self.message_subscribe(partner_ids=[customer_partner.id])
+        if follower_values:
+            Followers.create(follower_values)
 
         # Remove Administrator from followers if present
-        if admin_partner and admin_partner.id in self.message_partner_ids.ids:
-            self.message_unsubscribe(partner_ids=[admin_partner.id])
+        if admin_partner:
+            admin_record_ids = [
+                res_id
+                for res_id, partner_id in existing_followers
+                if partner_id == admin_partner.id
+            ]
+            if admin_record_ids:
+                Followers.search(
+                    [
+                        ("res_model", "=", self._name),
+                        ("res_id", "in", admin_record_ids),
+                        ("partner_id", "=", admin_partner.id),
+                    ]
+                ).unlink()
+
+        # Follower rows were written directly, refresh the computed relations
+        records.invalidate_recordset(["message_follower_ids", "message_partner_ids"])
 
     def _process_email_content(self, body):
         """Process email body content and update record state accordingly."""
         _logger.info(f"Processing email content: {body[:100]}...")
 
-        # Extract only the reply part (before any quoted content)
-        # First try to find standard Gmail/Outlook style quoted content
-        reply_text = body
-
-        # Look for common quote markers
-        quote_markers = [
-            "<div data-o-mail-quote",
-            "<blockquote",
-            "On .* wrote:",
-            "---Original Message---",
-            "------ Reply Message ------",
-            "________________________________",
-        ]
-
-        for marker in quote_markers:
-            import re
-
-            match = re.search(marker, body, re.IGNORECASE | re.DOTALL)
-            if match:
-                reply_text = body[: match.start()]
-                _logger.info(
-                    f"Found quote marker '{marker}', extracting only reply: {reply_text}"
-                )
-                break
-
-        # Now check only the actual reply text for keywords
-        reply_text = reply_text.lower()
-        _logger.info(
-            f"Checking reply portion for approval/development keywords: {reply_text}"
-        )
+        # Only the reply part (before any quoted content) is checked for
+        # the approval/development answers
+        intent, reply_text = classify_reply(body)
+        _logger.info(f"Reply classified as {intent}: {reply_text[:100]}")
 
         self.write(
             {
@@ -332,7 +332,7 @@ class ApiProduct(models.Model):
             }
         )
 
-        if "1" in reply_text or "approve" in reply_text or "agreed" in reply_text:
+        if intent == APPROVE:
             # Customer approved the design - change state to done
             _logger.info(f"Customer approved design for product {self.id}")
             self.write(
@@ -348,13 +348,7 @@ class ApiProduct(models.Model):
                 subtype_xmlid="mail.mt_note",
             )
 
-        elif (
-            "2" in reply_text
-            or "develop" in reply_text
-            or "change" in reply_text
-            or "need" in reply_text
-            or "adjust" in reply_text
-        ):
+        elif intent == DEVELOP:
             # Customer requested further development - change state to processing
             _logger.info(
                 f"Customer requested further development for product {self.id}"
@@ -414,13 +408,22 @@ class ApiProduct(models.Model):
                     _logger.info(
                         f"Found existing product with ID {product_id}, updating with email reply"
                     )
+                    author_id = msg_dict.get("author_id")
+                    if not author_id:
+                        # Replies from customers we created a partner for
+                        email_from = tools.email_split(msg_dict.get("from") or "")
+                        if email_from:
+                            author = self.env["res.partner"]._find_partners_by_email(
+                                email_from[:1]
+                            ).get(email_from[0])
+                            author_id = author.id if author else None
                     product.message_post(
                         body=msg_dict.get("body"),
                         subject=msg_dict.get("subject"),
                         message_type="email",
                         subtype_xmlid="mail.mt_comment",
                         email_from=msg_dict.get("from"),
-                        author_id=msg_dict.get("author_id"),
+                        author_id=author_id,
                     )
                     return product
             except Exception as e:
@@ -0,0 +1,39 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ApiProductLine(models.Model):
+    _name = "api.product.line"
+    _description = "API Product Line Item"
+    _order = "product_id, sequence, id"
+
+    product_id = fields.Many2one(
+        "api.product", string="Order", required=True, ondelete="cascade", index=True
+    )
+    sequence = fields.Integer("Sequence", default=10)
+    sku = fields.Char("SKU", index=True, help="Product SKU code")
+    name = fields.Char("Name", help="Item name from ShipStation")
+    quantity = fields.Integer("Quantity", default=1)
+    unit_price = fields.Float("Unit Price")
+    image_url = fields.Char("Image URL")
+    options = fields.Text("Options", help="Item options, one 'Name: Value' per line")
+
+    @api.model
+    def _prepare_values_from_item(self, item, sequence=10):
+        """Convert a ShipStation order item dict into line values"""
+        options = [
+            f"{option['name']}: {option['value']}"
+            for option in item.get("options") or []
+            if option.get("name") and option.get("value")
+        ]
+        return {
+            "sequence": sequence,
+            "sku": item.get("sku") or False,
+            "name": item.get("name") or False,
+            "quantity": item.get("quantity") or 0,
+            "unit_price": item.get("unitPrice") or 0.0,
+            "image_url": item.get("imageUrl") or False,
+            "options": "\n".join(options) or False,
+        }
@@ -7,11 +7,22 @@ from datetime import datetime, timedelta
 
 _logger = logging.getLogger(__name__)
 
+# api.product fields that feed the daily designer statistics
+STATISTICS_FIELDS = [
+    "designer_id",
+    "date",
+    "state",
+    "quantity",
+    "design_price",
+    "order_total",
+    "turnaround_hours",
+]
+
 
 class ApiStatistics(models.Model):
     _name = "inventory.api.statistics"
     _description = "Designer Performance Statistics"
-    _auto = False  # This is a database view, not a regular table
+    _auto = False  # Rollup table managed in init(), see _refresh_statistics_keys()
     _order = "designer_id, date desc, completed_count desc"
 
     # Main grouping fields
@@ -100,7 +111,6 @@ class ApiStatistics(models.Model):
         """Build the SELECT part of the SQL query"""
         return """
             SELECT
-                row_number() OVER () as id,
                 api.designer_id as designer_id,
                 api.date as date,
                 COUNT(CASE WHEN api.state = 'done' THEN 1 ELSE NULL END) as completed_count,
@@ -136,31 +146,121 @@ class ApiStatistics(models.Model):
         """
 
     @api.model
-    def init(self):
-        """Initialize the database view"""
-        tools = self.env["ir.model.data"]
+    def _insert(self):
+        """Build the INSERT part of the rollup query"""
+        return f"""
+            INSERT INTO {self._table} (
+                designer_id, date, completed_count, pending_count, quantity,
+                earnings, amount, avg_completion_time, source_id, product_id
+            )
+        """
 
-        # Drop the view if it exists to avoid column rename issues
-        self._cr.execute("DROP VIEW IF EXISTS %s" % self._table)
+    @api.model
+    def init(self):
+        """Create the daily rollup table and fill it if it is new
 
-        # Create the view from scratch
-        self._cr.execute(
+        Statistics are kept in a real table with one row per designer and
+        day. Rows are refreshed incrementally when orders change (see
+        ``_refresh_statistics_keys``) instead of re-aggregating ``api_product``
+        on every read.
+        """
+        self._cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = self._cr.fetchone()
+        if row and row[0] == "v":
+            # Earlier versions exposed the statistics as a plain view
+            self._cr.execute(f"DROP VIEW {self._table}")
+            row = None
+
+        if not row:
+            self._cr.execute(
+                f"""
+                CREATE TABLE {self._table} (
+                    id SERIAL PRIMARY KEY,
+                    designer_id INTEGER REFERENCES inventory_designer(id) ON DELETE CASCADE,
+                    date DATE,
+                    completed_count INTEGER,
+                    pending_count INTEGER,
+                    quantity INTEGER,
+                    earnings DOUBLE PRECISION,
+                    amount DOUBLE PRECISION,
+                    avg_completion_time DOUBLE PRECISION,
+                    source_id INTEGER,
+                    product_id INTEGER
+                )
             """
-            CREATE VIEW %s AS (
-                %s
-                %s
-                %s
-                %s
             )
+            self._rebuild_statistics()
+
+        tools.create_index(
+            self._cr,
+            f"{self._table}_designer_id_date_index",
+            self._table,
+            ["designer_id", "date"],
+        )
+        # Lookups of the orders behind a (designer, day) row
+        tools.create_index(
+            self._cr,
+            "api_product_designer_id_date_index",
+            "api_product",
+            ["designer_id", "date"],
+        )
+
+    @api.model
+    def _rebuild_statistics(self):
+        """Recompute the whole rollup table from api_product"""
+        self.env["api.product"].flush_model(STATISTICS_FIELDS)
+        self._cr.execute(f"DELETE FROM {self._table}")
+        self._cr.execute(
+            f"""
+            {self._insert()}
+            {self._select()}
+            {self._from()}
+            {self._where()}
+            {self._group_by()}
         """
-            % (
-                self._table,
-                self._select(),
-                self._from(),
-                self._where(),
-                self._group_by(),
-            )
         )
+        self.invalidate_model()
+        _logger.info(f"Rebuilt designer statistics: {self._cr.rowcount} rows")
+
+    @api.model
+    def _refresh_statistics_keys(self, keys):
+        """Recompute the rollup rows of the given (designer_id, date) pairs
+
+        Rows whose orders are all gone (or reassigned) are removed.
+
+        :param keys: iterable of (designer_id, date) tuples
+        """
+        keys = {(designer_id, date) for designer_id, date in keys if designer_id}
+        if not keys:
+            return
+        self.env["api.product"].flush_model(STATISTICS_FIELDS)
+
+        designer_ids = [designer_id for designer_id, date in keys]
+        dates = [date for designer_id, date in keys]
+        keys_table = "unnest(%s::integer[], %s::date[]) AS k(designer_id, date)"
+
+        self._cr.execute(
+            f"""
+            DELETE FROM {self._table} s
+            USING {keys_table}
+            WHERE s.designer_id = k.designer_id
+              AND s.date IS NOT DISTINCT FROM k.date
+        """,
+            (designer_ids, dates),
+        )
+        self._cr.execute(
+            f"""
+            {self._insert()}
+            {self._select()}
+            {self._from()}
+            JOIN {keys_table}
+              ON api.designer_id = k.designer_id
+             AND api.date IS NOT DISTINCT FROM k.date
+            {self._group_by()}
+        """,
+            (designer_ids, dates),
+        )
+        self.invalidate_model()
 
     def name_get(self):
         """Override the default name_get method to provide better record names"""
@@ -352,9 +452,42 @@ class ApiStatistics(models.Model):
 
     @api.model
     def refresh_statistics(self):
-        """Force refresh the statistics view"""
-        self.init()
+        """Rebuild the statistics table from scratch"""
+        self._rebuild_statistics()
         return {
             "type": "ir.actions.client",
             "tag": "reload",
         }
+
+
+class ApiProduct(models.Model):
+    _inherit = "api.product"
+
+    def _get_statistics_keys(self):
+        """(designer_id, date) rollup rows these orders contribute to"""
+        return {(record.designer_id.id, record.date) for record in self}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["inventory.api.statistics"]._refresh_statistics_keys(
+            records._get_statistics_keys()
+        )
+        return records
+
+    def write(self, vals):
+        # turnaround_hours is recomputed from the assignment/completion dates
+        tracked = set(STATISTICS_FIELDS) | {"assignment_date", "completion_date"}
+        if not tracked.intersection(vals):
+            return super().write(vals)
+        keys = self._get_statistics_keys()
+        result = super().write(vals)
+        keys |= self._get_statistics_keys()
+        self.env["inventory.api.statistics"]._refresh_statistics_keys(keys)
+        return result
+
+    def unlink(self):
+        keys = self._get_statistics_keys()
+        result = super().unlink()
+        self.env["inventory.api.statistics"]._refresh_statistics_keys(keys)
+        return result
@@ -2,9 +2,109 @@ from odoo import models, fields, api, _
 from datetime import datetime, timedelta
 import json
 import logging
+import threading
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Seconds a computed dashboard stays valid (inventory_button.dashboard_cache_ttl)
+DEFAULT_DASHBOARD_CACHE_TTL = 300
+# Maximum number of filter combinations kept in the dashboard cache
+DASHBOARD_CACHE_SIZE = 128
+
+# PostgreSQL sequences holding the cache generations of a database. Any worker
+# changing the cached data bumps them with nextval(), which is not
+# transactional, and every lookup reads them back, so cached values of all
+# workers are dropped at once (see _invalidate_generation).
+DASHBOARD_GENERATION_SEQUENCE = "inventory_button_dashboard_generation_seq"
+SHIP_STATES_GENERATION_SEQUENCE = "inventory_button_ship_states_generation_seq"
+
+# Computed dashboard values per worker, keyed by _get_dashboard_cache_key(),
+# which holds the database's dashboard generation. Entries are also dropped
+# once the TTL expires.
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+_dashboard_cache_stats = {"hits": 0, "misses": 0}
+
+# api.product fields the dashboard is computed from; writes to other fields
+# (e.g. message read status) keep the cache
+DASHBOARD_SOURCE_FIELDS = {
+    "name",
+    "order_number",
+    "date",
+    "state",
+    "order_status",
+    "order_total",
+    "product_name",
+    "design_price",
+    "designer_id",
+    "assignment_date",
+    "completion_date",
+    "quantity",
+    "ship_country",
+    "ship_state",
+}
+# Fields of the order lines and designers shown on the dashboard
+DASHBOARD_LINE_FIELDS = {"product_id", "name", "sku", "quantity", "unit_price"}
+DASHBOARD_DESIGNER_FIELDS = {"name", "active"}
+
+
+# Distinct shipping states per (dbname, api.product read rules), as
+# (generation, monotonic time, tuple of states); see ApiProduct._get_ship_states
+_ship_states_cache = {}
+
+
+def _read_generation(cr, sequence):
+    """Current cache generation of the cursor's database"""
+    cr.execute(f"SELECT last_value FROM {sequence}")
+    return cr.fetchone()[0]
+
+
+def _bump_generation(cr, sequence):
+    """Start a new cache generation, visible to all workers right away"""
+    cr.execute("SELECT nextval(%s)", (sequence,))
+
+
+def _invalidate_generation(env, sequence):
+    """Start a new cache generation now and once more when the transaction ends
+
+    Values computed before the commit, by this transaction or by a concurrent
+    one that doesn't see its changes yet, must not outlive it.
+    """
+    cr = env.cr
+    _bump_generation(cr, sequence)
+    flag = f"inventory_button.{sequence}"
+    if not cr.postcommit.data.get(flag):
+        cr.postcommit.data[flag] = True
+        registry = env.registry
+
+        def bump():
+            with registry.cursor() as bump_cr:
+                _bump_generation(bump_cr, sequence)
+
+        cr.postcommit.add(bump)
+        cr.postrollback.add(bump)
+
+
+def _dashboard_cache_get(key, ttl):
+    """Return the cached dashboard values for key, or None on a miss"""
+    with _dashboard_cache_lock:
+        entry = _dashboard_cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            _dashboard_cache_stats["hits"] += 1
+            return entry[1]
+        _dashboard_cache_stats["misses"] += 1
+        return None
+
+
+def _dashboard_cache_set(key, values):
+    """Store computed dashboard values, evicting the oldest entries when full"""
+    with _dashboard_cache_lock:
+        _dashboard_cache[key] = (time.monotonic(), values)
+        while len(_dashboard_cache) > DASHBOARD_CACHE_SIZE:
+            oldest = min(_dashboard_cache, key=lambda k: _dashboard_cache[k][0])
+            del _dashboard_cache[oldest]
+
 
 class InventoryDashboard(models.Model):
     _name = "inventory.dashboard"
@@ -141,64 +241,159 @@ class InventoryDashboard(models.Model):
         "Geographic Order Statistics", compute="_compute_dashboard_data"
     )
 
+    def init(self):
+        super().init()
+        for sequence in (DASHBOARD_GENERATION_SEQUENCE, SHIP_STATES_GENERATION_SEQUENCE):
+            self._cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+
     def _get_state_options(self):
-        """Dynamically generate state options based on shipping_address in api.product"""
-        products = self.env["api.product"].search([])
-        states = set()
-        for product in products:
-            if product.shipping_address:
-                address_lines = product.shipping_address.split("\n")
-                for line in address_lines:
-                    if "," in line:
-                        parts = line.split(",")
-                        if len(parts) > 1:
-                            state = parts[1].strip()
-                            if (
-                                state and len(state) <= 2
-                            ):  # US state codes are 2 letters
-                                states.add(state)
-        return [(state, state) for state in sorted(states)]
+        """Dynamically generate state options based on the shipping states in api.product"""
+        return [(state, state) for state in self.env["api.product"]._get_ship_states()]
+
+    @api.model
+    def _get_dashboard_cache_ttl(self):
+        """Dashboard cache lifetime in seconds, 0 disables the cache"""
+        value = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_button.dashboard_cache_ttl", DEFAULT_DASHBOARD_CACHE_TTL)
+        )
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            _logger.warning(f"Invalid inventory_button.dashboard_cache_ttl value: {value}")
+            return DEFAULT_DASHBOARD_CACHE_TTL
+
+    def _get_dashboard_cache_key(self):
+        """Key of the cached dashboard values for this record's filters
+
+        The record rules applying to the current user are part of the key, so
+        users seeing the same orders (e.g. all managers) share one entry.
+        """
+        self.ensure_one()
+        IrRule = self.env["ir.rule"]
+        return (
+            self.env.cr.dbname,
+            _read_generation(self.env.cr, DASHBOARD_GENERATION_SEQUENCE),
+            self.env.company.id,
+            # Selection labels are translated in the cached HTML
+            self.env.lang,
+            self.dashboard_active_view,
+            self.date_from,
+            self.date_to,
+            self.state_filter,
+            str(IrRule._compute_domain("api.product", "read")),
+            str(IrRule._compute_domain("inventory.designer", "read")),
+        )
+
+    @api.model
+    def get_dashboard_cache_stats(self):
+        """Return the dashboard cache hit/miss counters of this worker"""
+        with _dashboard_cache_lock:
+            stats = dict(_dashboard_cache_stats, size=len(_dashboard_cache))
+        stats["generation"] = _read_generation(self.env.cr, DASHBOARD_GENERATION_SEQUENCE)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _get_dashboard_domain(self):
+        """Domain on api.product for the dashboard's date range and state filter"""
+        self.ensure_one()
+        # Apply date filters
+        date_domain = []
+        if self.date_from:
+            date_domain.append(("date", ">=", self.date_from))
+        if self.date_to:
+            date_domain.append(("date", "<=", self.date_to))
+
+        # Apply state filter
+        if self.state_filter:
+            date_domain.append(("ship_state", "=", self.state_filter))
+        return date_domain
+
+    def _dashboard_query(self, domain):
+        """Translate a domain on api.product into SQL FROM/WHERE clauses
+
+        Record rules are applied the same way as for a regular search, so the
+        aggregates below only see the orders the user can read.
+
+        :return: tuple (from_clause, where_clause, params)
+        """
+        ApiProduct = self.env["api.product"]
+        # Make sure pending ORM changes are visible to the SQL queries
+        ApiProduct.flush_model()
+        self.env["api.product.line"].flush_model()
+        query = ApiProduct._where_calc(domain)
+        ApiProduct._apply_ir_rules(query, "read")
+        from_clause, where_clause, params = query.get_sql()
+        return from_clause, where_clause or "TRUE", params
 
     @api.depends("dashboard_active_view", "date_from", "date_to", "state_filter")
     def _compute_dashboard_data(self):
-        """Compute all dashboard data including geographic statistics"""
+        """Compute all dashboard data including geographic statistics
+
+        KPIs, status distribution, weekday histogram, designer statistics and
+        product revenue are aggregated by PostgreSQL with a handful of grouped
+        queries instead of loading every order in the ORM.
+        """
+        cr = self.env.cr
         for record in self:
-            # Apply date filters
-            date_domain = []
-            if record.date_from:
-                date_domain.append(("date", ">=", record.date_from))
-            if record.date_to:
-                date_domain.append(("date", "<=", record.date_to))
-
-            # Apply state filter
-            if record.state_filter:
-                date_domain.append(("shipping_address", "ilike", record.state_filter))
-
-            # Get counts for KPIs
-            total_orders = self.env["api.product"].search_count(date_domain)
-            awaiting_shipment = self.env["api.product"].search_count(
-                date_domain + [("order_status", "=", "awaiting_shipment")]
+            cache_key = record._get_dashboard_cache_key()
+            values = _dashboard_cache_get(cache_key, record._get_dashboard_cache_ttl())
+            if values is not None:
+                record.update(values)
+                continue
+
+            date_domain = record._get_dashboard_domain()
+            from_clause, where_clause, where_params = record._dashboard_query(
+                date_domain
             )
-            completed_orders = self.env["api.product"].search_count(
-                date_domain + [("state", "=", "done")]
+
+            # KPIs and status distribution in one pass, grouped by state
+            cr.execute(
+                f"""
+                SELECT "api_product"."state",
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE "api_product"."order_status" = 'awaiting_shipment'),
+                       COALESCE(SUM("api_product"."order_total"), 0),
+                       COALESCE(SUM("api_product"."design_price")
+                                FILTER (WHERE "api_product"."state" = 'done'), 0)
+                FROM {from_clause}
+                WHERE {where_clause}
+                GROUP BY "api_product"."state"
+                """,
+                where_params,
             )
+            status_counts = {}
+            total_orders = 0
+            awaiting_shipment = 0
+            total_product_revenue = 0.0
+            total_designer_revenue = 0.0
+            for state, count, awaiting, revenue, designer_revenue in cr.fetchall():
+                status_counts[state] = count
+                total_orders += count
+                awaiting_shipment += awaiting
+                total_product_revenue += revenue
+                total_designer_revenue += designer_revenue
+            completed_orders = status_counts.get("done", 0)
+
             active_designers = self.env["inventory.designer"].search_count(
                 [("active", "=", True)]
             )
 
-            # Calculate revenue metrics
-            products = self.env["api.product"].search(date_domain)
-            total_product_revenue = sum(products.mapped("order_total"))
-            total_designer_revenue = sum(
-                p.design_price for p in products if p.state == "done"
+            # Order frequency by day chart (ISODOW: 1 = Monday ... 7 = Sunday)
+            cr.execute(
+                f"""
+                SELECT EXTRACT(ISODOW FROM "api_product"."date")::integer, COUNT(*)
+                FROM {from_clause}
+                WHERE {where_clause} AND "api_product"."date" IS NOT NULL
+                GROUP BY 1
+                """,
+                where_params,
             )
-
-            # Order frequency by day chart
             day_counts = {i: 0 for i in range(7)}
-            for product in products:
-                if product.date:
-                    day_of_week = product.date.weekday()
-                    day_counts[day_of_week] += 1
+            for iso_day, count in cr.fetchall():
+                day_counts[iso_day - 1] = count
             day_names = [
                 "Monday",
                 "Tuesday",
@@ -214,52 +409,58 @@ class InventoryDashboard(models.Model):
 
             # Product status distribution chart
             status_data = []
-            status_counts = {}
             ApiProduct = self.env["api.product"]
             state_selection = dict(ApiProduct._fields["state"].selection)
             for status in ["all_orders", "processing", "approving", "done"]:
-                count = self.env["api.product"].search_count(
-                    date_domain + [("state", "=", status)]
-                )
-                status_counts[status] = count
                 status_data.append(
-                    {"label": state_selection.get(status, status), "value": count}
+                    {
+                        "label": state_selection.get(status, status),
+                        "value": status_counts.get(status, 0),
+                    }
                 )
 
             # Designer performance chart
             designers = self.env["inventory.designer"].search(
                 [("active", "=", True)], limit=10
             )
+            designer_metrics = {}
+            if designers:
+                cr.execute(
+                    f"""
+                    SELECT "api_product"."designer_id",
+                           COUNT(*),
+                           COUNT(*) FILTER (WHERE "api_product"."state" = 'done'),
+                           COUNT(*) FILTER (WHERE "api_product"."state" = 'done'
+                                            AND "api_product"."turnaround_hours" > 0),
+                           AVG("api_product"."turnaround_hours")
+                               FILTER (WHERE "api_product"."state" = 'done'
+                                       AND "api_product"."turnaround_hours" > 0),
+                           COALESCE(SUM("api_product"."design_price")
+                               FILTER (WHERE "api_product"."state" = 'done'
+                                       AND "api_product"."turnaround_hours" > 0), 0)
+                    FROM {from_clause}
+                    WHERE {where_clause} AND "api_product"."designer_id" IN %s
+                    GROUP BY "api_product"."designer_id"
+                    """,
+                    where_params + [tuple(designers.ids)],
+                )
+                designer_metrics = {row[0]: row[1:] for row in cr.fetchall()}
+
             designer_data = []
             designer_revenue_data = {}
             for designer in designers:
-                assigned_count = self.env["api.product"].search_count(
-                    date_domain + [("designer_id", "=", designer.id)]
-                )
-                completed_count = self.env["api.product"].search_count(
-                    date_domain
-                    + [("designer_id", "=", designer.id), ("state", "=", "done")]
-                )
-                completed_with_times = self.env["api.product"].search(
-                    date_domain
-                    + [
-                        ("designer_id", "=", designer.id),
-                        ("state", "=", "done"),
-                        ("turnaround_hours", ">", 0),
-                    ]
-                )
-                avg_turnaround = 0
-                if completed_with_times:
-                    avg_turnaround = sum(
-                        order.turnaround_hours for order in completed_with_times
-                    ) / len(completed_with_times)
-                designer_revenue = sum(
-                    order.design_price for order in completed_with_times
-                )
+                (
+                    assigned_count,
+                    completed_count,
+                    timed_count,
+                    avg_turnaround,
+                    designer_revenue,
+                ) = designer_metrics.get(designer.id, (0, 0, 0, 0, 0.0))
+                avg_turnaround = avg_turnaround or 0
                 designer_revenue_data[designer.id] = {
                     "name": designer.name,
                     "revenue": designer_revenue,
-                    "count": len(completed_with_times),
+                    "count": timed_count,
                 }
                 designer_data.append(
                     {
@@ -350,66 +551,21 @@ class InventoryDashboard(models.Model):
                     </thead>
                     <tbody>
             """
-            geographic_metrics = {}
-            total_quantity = 0
-            for product in products:
-                if product.shipping_address or product.item_details:
-                    # Initialize country and state
-                    country = state = ""
-
-                    # Parse shipping_address for state and country
-                    if product.shipping_address:
-                        address_lines = product.shipping_address.split("\n")
-                        for line in address_lines:
-                            if "," in line:
-                                parts = line.split(",")
-                                if len(parts) > 1:
-                                    state = parts[1].strip()
-                            if "US" in line.upper():
-                                country = "USA"
-
-                    # Fallback to item_details for country and state
-                    if product.item_details:
-                        try:
-                            # Parse item_details if it's a JSON string
-                            item_details = (
-                                json.loads(product.item_details)
-                                if isinstance(product.item_details, str)
-                                else product.item_details
-                            )
-                            # Check if item_details is a dict (full order) and has shipTo
-                            if isinstance(item_details, dict):
-                                ship_to = item_details.get("shipTo", {})
-                                if not country:
-                                    country = ship_to.get("country", "Unknown")
-                                if not state:
-                                    state = ship_to.get("state", "N/A")
-                            else:
-                                _logger.warning(
-                                    f"Unexpected item_details format for product {product.id}: {type(item_details)}"
-                                )
-                                country = country or "Unknown"
-                                state = state or "N/A"
-                        except (json.JSONDecodeError, TypeError) as e:
-                            _logger.warning(
-                                f"Failed to parse item_details for product {product.id}: {e}"
-                            )
-                            country = country or "Unknown"
-                            state = state or "N/A"
-
-                    # Default if no data
-                    if not country:
-                        country = "Unknown"
-                    if not state:
-                        state = "N/A"
-
-                    # Aggregate quantities
-                    key = (country, state)
-                    if key not in geographic_metrics:
-                        geographic_metrics[key] = 0
-                    geographic_metrics[key] += product.quantity or 0
-                    total_quantity += product.quantity or 0
-
+            cr.execute(
+                f"""
+                SELECT COALESCE(NULLIF("api_product"."ship_country", ''), 'Unknown'),
+                       COALESCE(NULLIF("api_product"."ship_state", ''), 'N/A'),
+                       COALESCE(SUM("api_product"."quantity"), 0)
+                FROM {from_clause}
+                WHERE {where_clause}
+                GROUP BY 1, 2
+                """,
+                where_params,
+            )
+            geographic_metrics = {
+                (country, state): quantity for country, state, quantity in cr.fetchall()
+            }
+            total_quantity = sum(geographic_metrics.values())
             for (country, state), quantity in sorted(
                 geographic_metrics.items(), key=lambda x: x[1], reverse=True
             ):
@@ -490,16 +646,25 @@ class InventoryDashboard(models.Model):
                     </thead>
                     <tbody>
             """
-            product_metrics = {}
-            for product in products:
-                product_name = product.product_name or product.name
-                if product_name not in product_metrics:
-                    product_metrics[product_name] = {"count": 0, "revenue": 0}
-                product_metrics[product_name]["count"] += 1
-                product_metrics[product_name]["revenue"] += product.order_total or 0
-            sorted_products = sorted(
-                product_metrics.items(), key=lambda x: x[1]["revenue"], reverse=True
+            # Units and revenue per SKU, from the order lines
+            cr.execute(
+                f"""
+                SELECT MIN(COALESCE(NULLIF(line.name, ''), line.sku)),
+                       COALESCE(SUM(line.quantity), 0),
+                       COALESCE(SUM(line.quantity * line.unit_price), 0)
+                FROM {from_clause}
+                JOIN api_product_line line ON line.product_id = "api_product"."id"
+                WHERE {where_clause}
+                GROUP BY COALESCE(NULLIF(line.sku, ''), line.name)
+                ORDER BY 3 DESC
+                LIMIT 10
+                """,
+                where_params,
             )
+            sorted_products = [
+                (product_name or "", {"count": count, "revenue": revenue})
+                for product_name, count, revenue in cr.fetchall()
+            ]
             for product_name, metrics in sorted_products[:10]:
                 avg_price = (
                     metrics["revenue"] / metrics["count"] if metrics["count"] > 0 else 0
@@ -547,48 +712,52 @@ class InventoryDashboard(models.Model):
             designer_revenue_html += "</tbody></table>"
 
             # Set computed values
-            record.dashboard_total_orders = total_orders
-            record.dashboard_awaiting_shipment = awaiting_shipment
-            record.dashboard_completed_orders = completed_orders
-            record.dashboard_active_designers = active_designers
-            record.dashboard_total_product_revenue = total_product_revenue
-            record.dashboard_total_designer_revenue = total_designer_revenue
-            record.dashboard_product_status_chart = json.dumps(
-                {
-                    "type": "pie",
-                    "data": status_data,
-                    "graph_type": "pie",
-                    "background_color": "#875A7B",
-                    "title": "Order Status Distribution",
-                }
-            )
-            record.dashboard_recent_orders = recent_orders_html
-            record.dashboard_orders_by_status = orders_by_status_html
-            record.dashboard_product_revenue_table = product_revenue_html
-            record.dashboard_order_frequency_chart = json.dumps(
-                {
-                    "type": "bar",
-                    "data": order_frequency_data,
-                    "graph_type": "bar",
-                    "background_color": "#5B9BD5",
-                    "title": "Orders by Day of Week",
-                    "stacked": False,
-                }
-            )
-            record.dashboard_designer_performance_chart = json.dumps(
-                {
-                    "type": "bar",
-                    "data": designer_data,
-                    "graph_type": "bar",
-                    "background_color": "#00A09D",
-                    "measure": "completed",
-                    "title": "Completed Orders by Designer",
-                }
-            )
-            record.dashboard_top_designers = top_designers_html
-            record.dashboard_designer_stats_table = designer_stats_html
-            record.dashboard_designer_revenue_table = designer_revenue_html
-            record.dashboard_geographic_stats_table = geographic_stats_html
+            values = {
+                "dashboard_total_orders": total_orders,
+                "dashboard_awaiting_shipment": awaiting_shipment,
+                "dashboard_completed_orders": completed_orders,
+                "dashboard_active_designers": active_designers,
+                "dashboard_total_product_revenue": total_product_revenue,
+                "dashboard_total_designer_revenue": total_designer_revenue,
+                "dashboard_product_status_chart": json.dumps(
+                    {
+                        "type": "pie",
+                        "data": status_data,
+                        "graph_type": "pie",
+                        "background_color": "#875A7B",
+                        "title": "Order Status Distribution",
+                    }
+                ),
+                "dashboard_recent_orders": recent_orders_html,
+                "dashboard_orders_by_status": orders_by_status_html,
+                "dashboard_product_revenue_table": product_revenue_html,
+                "dashboard_order_frequency_chart": json.dumps(
+                    {
+                        "type": "bar",
+                        "data": order_frequency_data,
+                        "graph_type": "bar",
+                        "background_color": "#5B9BD5",
+                        "title": "Orders by Day of Week",
+                        "stacked": False,
+                    }
+                ),
+                "dashboard_designer_performance_chart": json.dumps(
+                    {
+                        "type": "bar",
+                        "data": designer_data,
+                        "graph_type": "bar",
+                        "background_color": "#00A09D",
+                        "measure": "completed",
+                        "title": "Completed Orders by Designer",
+                    }
+                ),
+                "dashboard_top_designers": top_designers_html,
+                "dashboard_designer_stats_table": designer_stats_html,
+                "dashboard_designer_revenue_table": designer_revenue_html,
+                "dashboard_geographic_stats_table": geographic_stats_html,
+            }
+            record.update(values)
+            _dashboard_cache_set(cache_key, values)
 
     def action_apply_date_filter(self):
         """Apply the selected date range and state filter"""
@@ -669,3 +838,151 @@ class InventoryDashboard(models.Model):
         if not dashboard:
             dashboard = self.create({"name": "Main Dashboard"})
         return dashboard
+
+
+class ApiProduct(models.Model):
+    _inherit = "api.product"
+
+    @api.model
+    def _get_ship_states(self):
+        """Sorted tuple of the distinct shipping states of the orders the user can read
+
+        Walks the ship_state index with a recursive query (one index probe per
+        distinct state) instead of scanning the table. The result is cached
+        per set of record rules until an order brings in a state no other
+        order has (see _check_new_ship_states), or at the latest for the
+        dashboard cache TTL.
+        """
+        query = self._where_calc([])
+        self._apply_ir_rules(query, "read")
+        from_clause, where_clause, params = query.get_sql()
+        where_clause = where_clause or "TRUE"
+        key = (self.env.cr.dbname, from_clause, where_clause, tuple(map(str, params)))
+        generation = _read_generation(self.env.cr, SHIP_STATES_GENERATION_SEQUENCE)
+        ttl = self.env["inventory.dashboard"]._get_dashboard_cache_ttl()
+        with _dashboard_cache_lock:
+            entry = _ship_states_cache.get(key)
+        if entry and entry[0] == generation and time.monotonic() - entry[1] < ttl:
+            return entry[2]
+
+        self.flush_model()
+        self.env.cr.execute(
+            f"""
+            WITH RECURSIVE states AS (
+                (SELECT "api_product"."ship_state" AS ship_state
+                 FROM {from_clause}
+                 WHERE {where_clause} AND "api_product"."ship_state" IS NOT NULL
+                 ORDER BY "api_product"."ship_state" LIMIT 1)
+                UNION ALL
+                SELECT (SELECT "api_product"."ship_state"
+                        FROM {from_clause}
+                        WHERE {where_clause} AND "api_product"."ship_state" > s.ship_state
+                        ORDER BY "api_product"."ship_state" LIMIT 1)
+                FROM states s
+                WHERE s.ship_state IS NOT NULL
+            )
+            SELECT ship_state FROM states WHERE ship_state IS NOT NULL
+        """,
+            params + params,
+        )
+        states = tuple(row[0] for row in self.env.cr.fetchall() if row[0])
+        with _dashboard_cache_lock:
+            _ship_states_cache[key] = (generation, time.monotonic(), states)
+        return states
+
+    @api.model
+    def _invalidate_dashboard_cache(self):
+        """Drop the cached dashboards of all workers"""
+        _invalidate_generation(self.env, DASHBOARD_GENERATION_SEQUENCE)
+
+    @api.model
+    def _invalidate_ship_states_cache(self):
+        """Drop the cached state lists of all workers"""
+        _invalidate_generation(self.env, SHIP_STATES_GENERATION_SEQUENCE)
+
+    def _check_new_ship_states(self, states):
+        """Drop the cached state lists when these orders introduce a new state
+
+        A state is new when no other order has it yet; the check probes the
+        ship_state index once per state.
+        """
+        states = list({state for state in states if state})
+        if not states:
+            return
+        self.flush_model(["ship_state"])
+        self.env.cr.execute(
+            """
+            SELECT 1
+            FROM unnest(%s) AS s(ship_state)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM api_product
+                WHERE ship_state = s.ship_state AND id NOT IN %s
+            )
+            LIMIT 1
+        """,
+            (states, tuple(self.ids) or (0,)),
+        )
+        if self.env.cr.fetchone():
+            self._invalidate_ship_states_cache()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_dashboard_cache()
+        records._check_new_ship_states(vals.get("ship_state") for vals in vals_list)
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if DASHBOARD_SOURCE_FIELDS.intersection(vals):
+            self._invalidate_dashboard_cache()
+        if vals.get("ship_state"):
+            self._check_new_ship_states([vals["ship_state"]])
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self._invalidate_dashboard_cache()
+        return result
+
+
+class ApiProductLine(models.Model):
+    _inherit = "api.product.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["api.product"]._invalidate_dashboard_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if DASHBOARD_LINE_FIELDS.intersection(vals):
+            self.env["api.product"]._invalidate_dashboard_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env["api.product"]._invalidate_dashboard_cache()
+        return result
+
+
+class InventoryDesigner(models.Model):
+    _inherit = "inventory.designer"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["api.product"]._invalidate_dashboard_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if DASHBOARD_DESIGNER_FIELDS.intersection(vals):
+            self.env["api.product"]._invalidate_dashboard_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env["api.product"]._invalidate_dashboard_cache()
+        return result
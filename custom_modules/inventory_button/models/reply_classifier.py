@@ -0,0 +1,57 @@
+"""Classification of customer replies to design approval emails
+
+Customers answer the approval email with "1" / "Approve" or "2" / "Develop"
+(see _prepare_email_content). The functions here cut the quoted original
+message off the reply and look for those answers as whole words, with all
+patterns compiled once at import time. They don't depend on Odoo so they can
+be benchmarked on their own (benchmarks/reply_classifier.py).
+"""
+import html
+import re
+
+APPROVE = "approve"
+DEVELOP = "develop"
+
+# Start of the quoted original message in Odoo, Gmail, Outlook and
+# Thunderbird replies, matched on the lowercased body
+QUOTE_MARKER_RE = re.compile(
+    r"<(?:div data-o-mail-quote|blockquote)"
+    r"|\bon [^\n]{0,300}?\bwrote:"
+    r"|---+\s*(?:original|reply) message\s*---+"
+    r"|____________________+"
+)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# Answers offered in the approval email, as whole words of the lowercased
+# reply: "1" or "1." count but "10", "1.5" or "v1" don't
+INTENT_RES = [
+    (APPROVE, re.compile(r"\b(?:approv|agreed?\b|1(?!\w|[.,]\d))")),
+    (DEVELOP, re.compile(r"\b(?:develop|changes?\b|needs?\b|adjust|2(?!\w|[.,]\d))")),
+]
+
+
+def extract_reply(body):
+    """Return the lowercased text the customer wrote, without the quoted message or HTML"""
+    body = (body or "").lower()
+    match = QUOTE_MARKER_RE.search(body)
+    if match:
+        body = body[: match.start()]
+    if "<" in body:
+        body = HTML_TAG_RE.sub(" ", body)
+    if "&" in body:
+        body = html.unescape(body)
+    return body.strip()
+
+
+def classify_reply(body):
+    """Classify a customer reply
+
+    :param body: reply body, HTML or plain text
+    :return: tuple (intent, reply_text) where intent is APPROVE, DEVELOP or
+             None when the reply contains neither answer
+    """
+    reply_text = extract_reply(body)
+    for intent, pattern in INTENT_RES:
+        if pattern.search(reply_text):
+            return intent, reply_text
+    return None, reply_text
@@ -0,0 +1,40 @@
+from odoo import models, fields, api
+from .api_product_base import PRIORITY_WEIGHTS
+
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = "res.config.settings"
+
+    # Not config_parameter fields: those store a 0 as False, which deletes the
+    # parameter and brings the default weight back. get_values/set_values
+    # keep "0" as an explicit value instead.
+    priority_weight_manual_urgent = fields.Integer(
+        string="Manual Urgent Weight", default=PRIORITY_WEIGHTS["manual_urgent"]
+    )
+    priority_weight_fast_ship = fields.Integer(
+        string="Fast Ship Weight", default=PRIORITY_WEIGHTS["fast_ship"]
+    )
+    priority_weight_bulk_order = fields.Integer(
+        string="Bulk Order Weight", default=PRIORITY_WEIGHTS["bulk_order"]
+    )
+    priority_weight_design = fields.Integer(
+        string="Custom Design Weight", default=PRIORITY_WEIGHTS["design"]
+    )
+
+    @api.model
+    def get_values(self):
+        res = super().get_values()
+        weights = self.env["api.product"]._get_priority_weights()
+        res.update({f"priority_weight_{key}": value for key, value in weights.items()})
+        return res
+
+    def set_values(self):
+        super().set_values()
+        ApiProduct = self.env["api.product"]
+        old_weights = ApiProduct._get_priority_weights()
+        set_param = self.env["ir.config_parameter"].sudo().set_param
+        for key in PRIORITY_WEIGHTS:
+            set_param(f"inventory_button.priority_weight_{key}", str(self[f"priority_weight_{key}"] or 0))
+        # Stored priorities only follow the weights after a recompute
+        if ApiProduct._get_priority_weights() != old_weights:
+            ApiProduct.sudo()._backfill_priority()
@@ -0,0 +1,89 @@
+from odoo import models, api, tools
+from odoo.tools.lru import LRU
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Normalized email -> partner id, keyed by (dbname, email_normalized). Entries
+# are dropped when a partner's email changes or it is deleted in this worker;
+# hits are checked against the database so changes made by other workers are
+# never trusted blindly.
+_partner_email_cache = LRU(4096)
+
+
+def _forget_partner_email(dbname, email_normalized):
+    """Drop one email from the partner cache"""
+    try:
+        del _partner_email_cache[(dbname, email_normalized)]
+    except KeyError:
+        pass
+
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    def init(self):
+        super().init()
+        # Customer lookups by email from the order mail loop
+        tools.create_index(
+            self._cr,
+            "res_partner_email_normalized_index",
+            self._table,
+            ["email_normalized"],
+        )
+
+    @api.model
+    def _find_partners_by_email(self, emails):
+        """Find the existing partners of a list of email addresses
+
+        Emails are compared on their normalized (lowercase) form through the
+        indexed email_normalized column, and recently resolved emails are
+        served from an in-process cache.
+
+        :param emails: iterable of email addresses as received
+        :return: dict {email: res.partner} for the emails that have a partner
+        """
+        dbname = self.env.cr.dbname
+        emails_by_normalized = {}
+        for email in emails:
+            normalized = tools.email_normalize(email)
+            if normalized:
+                emails_by_normalized.setdefault(normalized, []).append(email)
+        if not emails_by_normalized:
+            return {}
+
+        partner_by_normalized = {}
+        # Check cached ids with a primary key lookup
+        cached_ids = {
+            normalized: _partner_email_cache.get((dbname, normalized))
+            for normalized in emails_by_normalized
+        }
+        cached_ids = {key: value for key, value in cached_ids.items() if value}
+        if cached_ids:
+            for partner in self.search([("id", "in", list(cached_ids.values()))]):
+                if cached_ids.get(partner.email_normalized) == partner.id:
+                    partner_by_normalized[partner.email_normalized] = partner
+
+        missing = [key for key in emails_by_normalized if key not in partner_by_normalized]
+        if missing:
+            for partner in self.search([("email_normalized", "in", missing)], order="id"):
+                if partner.email_normalized not in partner_by_normalized:
+                    partner_by_normalized[partner.email_normalized] = partner
+                    _partner_email_cache[(dbname, partner.email_normalized)] = partner.id
+
+        return {
+            email: partner
+            for normalized, partner in partner_by_normalized.items()
+            for email in emails_by_normalized[normalized]
+        }
+
+    def write(self, vals):
+        if "email" in vals or "active" in vals:
+            for partner in self:
+                _forget_partner_email(self.env.cr.dbname, partner.email_normalized)
+        return super().write(vals)
+
+    def unlink(self):
+        for partner in self:
+            _forget_partner_email(self.env.cr.dbname, partner.email_normalized)
+        return super().unlink()
@@ -43,6 +43,53 @@ class SendMessage(models.AbstractModel):
             _logger.error(f"Failed to send notification: {e}")
             return False
 
+    @api.model
+    def send_group_notification(
+        self, group, title, message, sticky=False, message_type="info"
+    ):
+        """
+        Broadcast a notification to all active users of a group in one bus write.
+
+        Args:
+            group: The res.groups record (or its XML ID) whose users are notified
+            title: The title of the notification
+            message: The body message of the notification
+            sticky: Whether the notification should stay until dismissed
+            message_type: Type of message (info, success, warning, danger)
+
+        Returns:
+            int: Number of partners the notification was sent to
+        """
+        if isinstance(group, str):
+            group = self.env.ref(group, raise_if_not_found=False)
+        if not group:
+            _logger.warning("Cannot send group notification: group not found")
+            return 0
+
+        # res.groups.users only returns active users
+        partners = group.sudo().users.partner_id
+        if not partners:
+            _logger.info(f"No users in group {group.name} to notify: {title}")
+            return 0
+
+        _logger.info(
+            f"Sending notification to {len(partners)} users of {group.name}: {title} - {message}"
+        )
+        payload = {
+            "title": title,
+            "message": message,
+            "sticky": sticky,
+            "type": message_type,
+        }
+        try:
+            self.env["bus.bus"]._sendmany(
+                [(partner, "simple_notification", payload) for partner in partners]
+            )
+            return len(partners)
+        except Exception as e:
+            _logger.error(f"Failed to send group notification: {e}")
+            return 0
+
     @api.model
     def notify_customer_reply(self, record, type="info"):
         """
@@ -0,0 +1,207 @@
+import base64
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+SHIPSTATION_BASE_URL = "https://ssapi.shipstation.com"
+
+# Responses that are retried with exponential backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Methods that can safely be replayed after a server error
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "DELETE")
+# Seconds after which an unused client is closed and dropped, e.g. the client
+# of credentials rotated or removed in another worker
+CLIENT_IDLE_TIMEOUT = 3600
+
+
+class ShipStationClient:
+    """Shared HTTP client for the ShipStation API
+
+    One client is kept per set of API credentials, i.e. per API source. It owns
+    a pooled ``requests.Session`` so TLS connections are reused between calls,
+    tracks ShipStation's ``X-Rate-Limit-*`` headers to wait for the next window
+    instead of hitting 429s, retries 429/5xx responses with exponential backoff
+    and keeps latency metrics for every call.
+    """
+
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(self, api_key, api_secret, max_retries=4, backoff_factor=1.0, max_delay=60):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Create authorization string (API Key:API Secret) and encode it in Base64
+        encoded_auth = base64.b64encode(f"{api_key}:{api_secret}".encode()).decode()
+        self.session.headers.update(
+            {
+                "Authorization": f"Basic {encoded_auth}",
+                "Content-Type": "application/json",
+            }
+        )
+
+        # Rate limit state reported by the last response
+        self._lock = threading.Lock()
+        self.rate_limit_remaining = None
+        self.rate_limit_reset_at = 0.0
+
+        self.last_used = time.monotonic()
+        self.metrics = {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_ms": 0.0,
+        }
+
+    @classmethod
+    def get_client(cls, api_key, api_secret):
+        """Return the shared client for these credentials, creating it if needed
+
+        Clients left unused for CLIENT_IDLE_TIMEOUT are closed on the way.
+        """
+        key = (api_key, api_secret)
+        now = time.monotonic()
+        with cls._clients_lock:
+            idle_keys = [
+                idle_key
+                for idle_key, client in cls._clients.items()
+                if idle_key != key and now - client.last_used > CLIENT_IDLE_TIMEOUT
+            ]
+            idle_clients = [cls._clients.pop(idle_key) for idle_key in idle_keys]
+            client = cls._clients.get(key)
+            if client is None:
+                client = cls._clients[key] = cls(api_key, api_secret)
+            client.last_used = now
+        for idle_client in idle_clients:
+            idle_client.session.close()
+        return client
+
+    @classmethod
+    def find_client(cls, api_key, api_secret):
+        """Return the existing client for these credentials, or None"""
+        with cls._clients_lock:
+            return cls._clients.get((api_key, api_secret))
+
+    @classmethod
+    def discard_client(cls, api_key, api_secret):
+        """Close and drop the client of credentials that are no longer used"""
+        with cls._clients_lock:
+            client = cls._clients.pop((api_key, api_secret), None)
+        if client is not None:
+            client.session.close()
+
+    def _wait_for_rate_limit(self):
+        """Sleep until the rate limit window resets if no calls are left in it"""
+        with self._lock:
+            remaining = self.rate_limit_remaining
+            delay = self.rate_limit_reset_at - time.monotonic()
+        if remaining is not None and remaining <= 0 and delay > 0:
+            delay = min(delay, self.max_delay)
+            _logger.info(f"ShipStation rate limit reached, waiting {delay:.1f}s")
+            time.sleep(delay)
+
+    def _update_rate_limit(self, response):
+        """Remember the rate limit headers returned by ShipStation"""
+        remaining = response.headers.get("X-Rate-Limit-Remaining")
+        reset = response.headers.get("X-Rate-Limit-Reset")
+        with self._lock:
+            try:
+                self.rate_limit_remaining = int(remaining) if remaining is not None else None
+                if reset is not None:
+                    self.rate_limit_reset_at = time.monotonic() + int(reset)
+            except ValueError:
+                _logger.debug(f"Unexpected rate limit headers: {remaining}/{reset}")
+
+    def _record_call(self, started, failed):
+        """Update the latency metrics with a finished call"""
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self.metrics["calls"] += 1
+            self.metrics["total_ms"] += elapsed_ms
+            self.metrics["last_ms"] = elapsed_ms
+            self.metrics["max_ms"] = max(self.metrics["max_ms"], elapsed_ms)
+            if failed:
+                self.metrics["errors"] += 1
+        return elapsed_ms
+
+    def _retry_delay(self, attempt, response):
+        """Delay before the next attempt: the rate limit reset for 429s, exponential otherwise"""
+        delay = self.backoff_factor * (2**attempt)
+        if response.status_code == 429:
+            reset = response.headers.get("X-Rate-Limit-Reset")
+            if reset and reset.isdigit():
+                delay = max(delay, int(reset))
+        return min(delay, self.max_delay)
+
+    def request(self, method, url, **kwargs):
+        """Send a request to ShipStation, honoring rate limits and retrying 429/5xx
+
+        :param url: absolute URL or path relative to the ShipStation API
+        :return: the final ``requests.Response``
+        """
+        method = method.upper()
+        if not url.startswith(("http://", "https://")):
+            url = SHIPSTATION_BASE_URL + url
+        kwargs.setdefault("timeout", 30)
+
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit()
+            started = self.last_used = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record_call(started, failed=True)
+                raise
+
+            elapsed_ms = self._record_call(started, failed=response.status_code >= 400)
+            self._update_rate_limit(response)
+            _logger.debug(
+                f"ShipStation {method} {url} -> {response.status_code} in {elapsed_ms:.0f} ms"
+            )
+
+            retryable = response.status_code == 429 or (
+                response.status_code in RETRY_STATUS_CODES and method in IDEMPOTENT_METHODS
+            )
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            delay = self._retry_delay(attempt, response)
+            attempt += 1
+            with self._lock:
+                self.metrics["retries"] += 1
+            _logger.warning(
+                f"ShipStation {method} {url} returned {response.status_code}, "
+                f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def get_metrics(self):
+        """Return a snapshot of the call metrics, including the average latency"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics["rate_limit_remaining"] = self.rate_limit_remaining
+        metrics["avg_ms"] = metrics["total_ms"] / metrics["calls"] if metrics["calls"] else 0.0
+        return metrics
@@ -0,0 +1,94 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ShipStationStore(models.Model):
+    _name = "shipstation.store"
+    _description = "ShipStation Store"
+    _order = "source_id, name, store_id"
+
+    source_id = fields.Many2one(
+        "inventory.admin.settings",
+        string="API Source",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    store_id = fields.Integer(
+        "Store ID", required=True, index=True, help="ID of the store in ShipStation"
+    )
+    name = fields.Char("Store Name")
+    color = fields.Char("Color", default="#CCCCCC", help="Color for the store in the UI")
+    marketplace_name = fields.Char("Marketplace")
+
+    _sql_constraints = [
+        (
+            "source_store_uniq",
+            "unique(source_id, store_id)",
+            "A ShipStation store can only be registered once per API source.",
+        ),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        stores = super().create(vals_list)
+        stores._link_products()
+        return stores
+
+    def _link_products(self):
+        """Attach orders imported before their store was known"""
+        ApiProduct = self.env["api.product"]
+        products = ApiProduct.search(
+            [
+                ("shipstation_store_id", "=", False),
+                ("source_id", "in", self.source_id.ids),
+                ("store_id", "in", self.mapped("store_id")),
+            ]
+        )
+        if products:
+            self.env.add_to_compute(ApiProduct._fields["shipstation_store_id"], products)
+
+    @api.model
+    def _sync_source_stores(self, source, stores_data):
+        """Create or update the stores of a source from ShipStation store data
+
+        Colors of stores that already exist are kept so that they stay stable
+        in the UI.
+
+        :param source: inventory.admin.settings record
+        :param stores_data: list of dicts with storeId, storeName and
+                            optionally marketplaceName and color
+        :return: the created stores
+        """
+        existing = {store.store_id: store for store in source.store_ids}
+        new_vals = []
+        new_store_ids = set()
+        for data in stores_data:
+            store_id = data.get("storeId")
+            if not store_id or store_id in new_store_ids:
+                continue
+            vals = {}
+            if data.get("storeName"):
+                vals["name"] = data["storeName"]
+            if data.get("marketplaceName"):
+                vals["marketplace_name"] = data["marketplaceName"]
+
+            store = existing.get(store_id)
+            if store:
+                vals = {key: value for key, value in vals.items() if store[key] != value}
+                if vals:
+                    store.write(vals)
+                continue
+
+            if data.get("color"):
+                vals["color"] = data["color"]
+            vals.update({"source_id": source.id, "store_id": store_id})
+            new_vals.append(vals)
+            new_store_ids.add(store_id)
+
+        stores = self.create(new_vals)
+        if stores:
+            _logger.info(f"Added {len(stores)} stores to source {source.name}")
+        return stores
@@ -0,0 +1,374 @@
+from odoo import models, fields, api
+import json
+import logging
+import threading
+from datetime import timedelta
+
+_logger = logging.getLogger(__name__)
+
+# Number of processing attempts before an event is marked as failed
+WEBHOOK_MAX_ATTEMPTS = 3
+# Default window (seconds) during which ORDER_NOTIFY webhooks of a source are coalesced
+DEFAULT_COALESCE_SECONDS = 30
+# Events left in processing longer than this (minutes) were interrupted and are queued again
+PROCESSING_TIMEOUT_MINUTES = 60
+# Default number of days processed events are kept (inventory_button.webhook_retention_days)
+DEFAULT_RETENTION_DAYS = 30
+
+
+class ShipStationWebhookEvent(models.Model):
+    _name = "shipstation.webhook.event"
+    _description = "ShipStation Webhook Event"
+    _order = "id desc"
+    _rec_name = "resource_type"
+
+    source_identifier = fields.Char(string="Source Identifier", index=True, readonly=True)
+    source_id = fields.Many2one(
+        "inventory.admin.settings",
+        string="API Source",
+        ondelete="set null",
+        readonly=True,
+    )
+    resource_type = fields.Char(string="Resource Type", readonly=True)
+    resource_url = fields.Char(string="Resource URL", readonly=True)
+    import_batch = fields.Char(
+        string="Import Batch",
+        readonly=True,
+        help="ShipStation importBatch to fetch; empty when webhooks of several batches were coalesced",
+    )
+    payload = fields.Text(string="Payload", readonly=True, help="Raw webhook data as JSON")
+    dedup_key = fields.Char(
+        string="Deduplication Key",
+        index=True,
+        readonly=True,
+        help="Events with the same key still waiting in the queue are merged into one",
+    )
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("processing", "Processing"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        default="pending",
+        required=True,
+        index=True,
+        readonly=True,
+    )
+    received_date = fields.Datetime(
+        string="Received", default=fields.Datetime.now, required=True, readonly=True
+    )
+    scheduled_date = fields.Datetime(
+        string="Scheduled",
+        default=fields.Datetime.now,
+        required=True,
+        index=True,
+        readonly=True,
+        help="The event is not processed before this date, so that webhooks "
+        "arriving in the meantime can be coalesced into it",
+    )
+    processed_date = fields.Datetime(string="Processed", readonly=True)
+    duplicate_count = fields.Integer(
+        string="Duplicates",
+        default=0,
+        readonly=True,
+        help="Identical webhooks received while this event was waiting in the queue",
+    )
+    coalesced_count = fields.Integer(
+        string="Coalesced",
+        default=0,
+        readonly=True,
+        help="ORDER_NOTIFY webhooks of the same source folded into this event",
+    )
+    attempts = fields.Integer(string="Attempts", default=0, readonly=True)
+    result_message = fields.Text(string="Result", readonly=True)
+
+    @api.model
+    def _get_coalesce_window(self):
+        """Coalescing window in seconds (inventory_button.webhook_coalesce_seconds)"""
+        value = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_button.webhook_coalesce_seconds", DEFAULT_COALESCE_SECONDS)
+        )
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            _logger.warning(f"Invalid inventory_button.webhook_coalesce_seconds value: {value}")
+            return DEFAULT_COALESCE_SECONDS
+
+    @api.model
+    def _get_retention_days(self):
+        """Days processed events are kept (inventory_button.webhook_retention_days), 0 keeps them"""
+        value = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("inventory_button.webhook_retention_days", DEFAULT_RETENTION_DAYS)
+        )
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            _logger.warning(f"Invalid inventory_button.webhook_retention_days value: {value}")
+            return DEFAULT_RETENTION_DAYS
+
+    @api.model
+    def _gc_done_events(self):
+        """Delete the events processed successfully before the retention period"""
+        retention_days = self._get_retention_days()
+        if not retention_days:
+            return 0
+        events = self.search(
+            [
+                ("state", "=", "done"),
+                ("processed_date", "<", fields.Datetime.now() - timedelta(days=retention_days)),
+            ]
+        )
+        if events:
+            events.unlink()
+            _logger.info(f"Deleted {len(events)} processed webhook events older than {retention_days} days")
+        return len(events)
+
+    @api.model
+    def _extract_import_batch(self, resource_url):
+        """Extract the importBatch parameter from a webhook resource_url"""
+        if resource_url and "importBatch=" in resource_url:
+            return resource_url.split("importBatch=")[1].split("&")[0] or False
+        return False
+
+    def _coalesce(self, data):
+        """Fold another ORDER_NOTIFY webhook of the same source into this pending event
+
+        When the webhooks point at different import batches the event falls
+        back to a regular (incremental) fetch of the source, which covers them all.
+        """
+        self.ensure_one()
+        vals = {"coalesced_count": self.coalesced_count + 1}
+        import_batch = self._extract_import_batch(data.get("resource_url"))
+        if self.import_batch and import_batch != self.import_batch:
+            payload = json.loads(self.payload or "{}")
+            payload.pop("resource_url", None)
+            vals.update(
+                {
+                    "import_batch": False,
+                    "resource_url": False,
+                    "payload": json.dumps(payload),
+                }
+            )
+        self.write(vals)
+        _logger.info(
+            f"ORDER_NOTIFY webhook coalesced into queued event {self.id} "
+            f"({self.coalesced_count} so far)"
+        )
+
+    @api.model
+    def enqueue(self, data):
+        """Store an incoming webhook payload in the queue and wake up the worker
+
+        ORDER_NOTIFY webhooks for a source are delayed by the coalescing window
+        and any further ORDER_NOTIFY for that source arriving in the meantime is
+        folded into the waiting event, so a burst results in a single fetch.
+        Other webhooks for the same source and resource_url that are still
+        waiting are deduplicated into one event.
+
+        :return: the queued shipstation.webhook.event record
+        """
+        source_identifier = data.get("source_identifier")
+        resource_type = data.get("resource_type")
+        resource_url = data.get("resource_url") or ""
+
+        if resource_type == "ORDER_NOTIFY":
+            dedup_key = f"{source_identifier or ''}|ORDER_NOTIFY"
+        else:
+            dedup_key = (
+                f"{source_identifier or ''}|{resource_url}" if resource_url else False
+            )
+
+        if dedup_key:
+            existing = self.search(
+                [("dedup_key", "=", dedup_key), ("state", "=", "pending")], limit=1
+            )
+            if existing:
+                if resource_type == "ORDER_NOTIFY":
+                    existing._coalesce(data)
+                else:
+                    existing.duplicate_count += 1
+                    _logger.info(
+                        f"Duplicate webhook merged into queued event {existing.id} ({dedup_key})"
+                    )
+                return existing
+
+        source = self.env["inventory.admin.settings"]
+        if source_identifier:
+            source = source.search(
+                [("source_identifier", "=", source_identifier)], limit=1
+            )
+
+        scheduled_date = fields.Datetime.now()
+        if resource_type == "ORDER_NOTIFY":
+            scheduled_date += timedelta(seconds=self._get_coalesce_window())
+
+        event = self.create(
+            {
+                "source_identifier": source_identifier,
+                "source_id": source.id,
+                "resource_type": resource_type,
+                "resource_url": resource_url,
+                "import_batch": self._extract_import_batch(resource_url),
+                "payload": json.dumps(data),
+                "dedup_key": dedup_key,
+                "scheduled_date": scheduled_date,
+            }
+        )
+        _logger.info(f"Queued ShipStation webhook event {event.id}")
+
+        # Run the queue worker once the event is due instead of waiting for the next interval
+        cron = self.env.ref(
+            "inventory_button.ir_cron_process_webhook_queue", raise_if_not_found=False
+        )
+        if cron:
+            cron.sudo()._trigger(at=scheduled_date)
+        return event
+
+    def _process(self):
+        """Run the webhook pipeline for a queued event"""
+        self.ensure_one()
+        self.attempts += 1
+        try:
+            data = json.loads(self.payload or "{}")
+            result = self.env["api.product"].process_webhook_data(data)
+        except Exception as e:
+            _logger.error(f"Error processing webhook event {self.id}: {e}", exc_info=True)
+            result = {"status": "error", "message": str(e)}
+
+        failed = isinstance(result, dict) and (
+            result.get("status") == "error"
+            or result.get("params", {}).get("type") == "danger"
+        )
+        message = ""
+        if isinstance(result, dict):
+            message = result.get("message") or result.get("params", {}).get("message", "")
+
+        if not failed:
+            state = "done"
+        elif self.attempts >= WEBHOOK_MAX_ATTEMPTS:
+            state = "failed"
+        else:
+            # Leave it in the queue for another attempt
+            state = "pending"
+
+        self.write(
+            {
+                "state": state,
+                "processed_date": fields.Datetime.now() if state != "pending" else False,
+                "result_message": message,
+            }
+        )
+        return not failed
+
+    @api.model
+    def _cron_process_queue(self, limit=100):
+        """Drain the webhook queue, oldest events first
+
+        Events are marked as processing (and committed) before they run, so
+        that webhooks arriving meanwhile are queued as new events instead of
+        being folded into an event whose fetch has already started.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        interrupted = self.search(
+            [
+                ("state", "=", "processing"),
+                (
+                    "write_date",
+                    "<",
+                    fields.Datetime.now() - timedelta(minutes=PROCESSING_TIMEOUT_MINUTES),
+                ),
+            ]
+        )
+        if interrupted:
+            _logger.warning(f"Queuing {len(interrupted)} interrupted webhook events again")
+            interrupted.write({"state": "pending"})
+        events = self.search(
+            [
+                ("state", "=", "pending"),
+                ("scheduled_date", "<=", fields.Datetime.now()),
+            ],
+            order="id",
+            limit=limit,
+        )
+        _logger.info(f"Processing {len(events)} queued ShipStation webhook events")
+
+        for event in events:
+            event.state = "processing"
+            if auto_commit:
+                self.env.cr.commit()
+            event._process()
+            if auto_commit:
+                self.env.cr.commit()
+
+        self._gc_done_events()
+
+        # Still more waiting: schedule another run right away
+        if len(events) == limit:
+            cron = self.env.ref(
+                "inventory_button.ir_cron_process_webhook_queue", raise_if_not_found=False
+            )
+            if cron:
+                cron._trigger()
+
+    @api.model
+    def get_queue_stats(self):
+        """Return queue depth and lag
+
+        The lag is how long the most overdue pending event has been waiting
+        since its scheduled date, so the coalescing window is not counted.
+        """
+        now = fields.Datetime.now()
+        pending_count = self.search_count([("state", "=", "pending")])
+        failed_count = self.search_count([("state", "=", "failed")])
+        oldest = self.search(
+            [("state", "=", "pending"), ("scheduled_date", "<=", now)],
+            order="scheduled_date, id",
+            limit=1,
+        )
+        lag = 0
+        if oldest:
+            lag = (now - oldest.scheduled_date).total_seconds()
+        return {
+            "depth": pending_count,
+            "failed": failed_count,
+            "lag_seconds": int(lag),
+        }
+
+    @api.model
+    def action_show_queue_stats(self):
+        """Show the current queue depth and lag as a notification"""
+        stats = self.get_queue_stats()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Webhook Queue",
+                "message": f"Pending: {stats['depth']}, Failed: {stats['failed']}, "
+                f"Lag: {stats['lag_seconds']} seconds past schedule",
+                "sticky": False,
+                "type": "info" if stats["failed"] == 0 else "warning",
+            },
+        }
+
+    def action_retry(self):
+        """Put failed events back in the queue, other selected events are left as they are"""
+        self.filtered(lambda event: event.state == "failed").write(
+            {
+                "state": "pending",
+                "attempts": 0,
+                "processed_date": False,
+                "scheduled_date": fields.Datetime.now(),
+            }
+        )
+        cron = self.env.ref(
+            "inventory_button.ir_cron_process_webhook_queue", raise_if_not_found=False
+        )
+        if cron:
+            cron.sudo()._trigger()
+        return True
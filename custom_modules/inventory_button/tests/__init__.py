@@ -0,0 +1,3 @@
+from . import test_followers
+from . import test_import_orders
+from . import test_shipping_address
@@ -0,0 +1,34 @@
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestFollowers(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ApiProduct = cls.env["api.product"]
+        cls.customer = cls.env["res.partner"].create(
+            {"name": "Customer", "email": "customer@example.com"}
+        )
+        cls.employee = new_test_user(
+            cls.env, login="follower_employee", email="employee@example.com"
+        ).partner_id
+
+    def _follower_subtypes(self, order, partner):
+        follower = order.message_follower_ids.filtered(lambda f: f.partner_id == partner)
+        self.assertEqual(len(follower), 1)
+        return follower.subtype_ids
+
+    def test_subtypes_match_message_subscribe(self):
+        """Customers follow imported orders with the subtypes message_subscribe gives them"""
+        for partner in self.customer | self.employee:
+            with self.subTest(partner=partner.name):
+                order = self.ApiProduct.create(
+                    {"api_id": 1, "name": "Order", "customer_email": partner.email}
+                )
+                reference = self.ApiProduct.create({"api_id": 2, "name": "Reference"})
+                reference.message_subscribe(partner_ids=partner.ids)
+                self.assertEqual(
+                    self._follower_subtypes(order, partner),
+                    self._follower_subtypes(reference, partner),
+                )
@@ -0,0 +1,108 @@
+import threading
+from unittest.mock import patch
+
+from psycopg2.errors import UniqueViolation
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+from odoo.tools.sql import constraint_definition
+
+from ..models.api_product_api import ApiProduct
+
+
+@tagged("post_install", "-at_install")
+class TestImportOrders(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ApiProduct = cls.env["api.product"]
+        cls.source = cls.env["inventory.admin.settings"].create(
+            {
+                "name": "Test source",
+                "source_identifier": "test-source",
+                "api_key": "key",
+                "api_secret": "secret",
+            }
+        )
+
+    def _order(self, order_number, status="awaiting_shipment"):
+        return {
+            "orderId": 1,
+            "orderNumber": order_number,
+            "orderStatus": status,
+            "orderDate": "2024-05-01T10:00:00.0000000",
+            "modifyDate": "2024-05-01T10:00:00.0000000",
+            "storeName": "Test store",
+            "advancedOptions": {"storeId": 42},
+            "items": [
+                {"orderItemId": 7, "sku": "SKU-1", "name": "Mug", "quantity": 1, "unitPrice": 10.0}
+            ],
+        }
+
+    def _fetch(self, orders):
+        pages = [(1, 1, orders)]
+        with patch.object(ApiProduct, "_iter_order_pages", return_value=iter(pages)):
+            return self.ApiProduct.fetch_from_source(self.source)
+
+    def test_unique_order_key(self):
+        self.assertTrue(
+            constraint_definition(self.env.cr, "api_product", "api_product_source_order_number_uniq")
+        )
+        self._fetch([self._order("1001")])
+        vals = self.ApiProduct._prepare_order_values(self.source, self._order("1001"))
+        with self.assertRaises(UniqueViolation), mute_logger("odoo.sql_db"):
+            with self.env.cr.savepoint():
+                self.ApiProduct.create(vals)
+
+    def test_page_retried_after_concurrent_import(self):
+        """A page whose orders were committed by another import meanwhile is imported again"""
+        # The order the concurrent import committed, only visible after the retry
+        self._fetch([self._order("1002")])
+        import_page = ApiProduct._import_source_page
+        calls = []
+
+        def import_source_page(model, *args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise UniqueViolation("duplicate key value violates unique constraint")
+            return import_page(model, *args)
+
+        with patch.object(ApiProduct, "_import_source_page", import_source_page), patch.object(
+            threading.current_thread(), "testing", False
+        ), patch.object(self.env.cr, "commit") as commit:
+            result = self._fetch([self._order("1002", "shipped"), self._order("1003")])
+
+        self.assertEqual(len(calls), 2)
+        commit.assert_called()
+        self.assertEqual(result["params"]["type"], "success")
+        orders = self.ApiProduct.search(
+            [("source_id", "=", self.source.id), ("order_number", "in", ["1002", "1003"])]
+        )
+        self.assertEqual(sorted(orders.mapped("order_number")), ["1002", "1003"])
+        self.assertEqual(orders.filtered(lambda o: o.order_number == "1002").order_status, "shipped")
+
+    def test_concurrent_import_without_auto_commit(self):
+        """Inside a test transaction the conflict is reported instead of committing"""
+        def import_source_page(model, *args):
+            raise UniqueViolation("duplicate key value violates unique constraint")
+
+        with patch.object(ApiProduct, "_import_source_page", import_source_page), patch.object(
+            self.env.cr, "commit"
+        ) as commit:
+            result = self._fetch([self._order("1004")])
+
+        commit.assert_not_called()
+        self.assertEqual(result["params"]["type"], "danger")
+        self.assertFalse(self.ApiProduct.search([("order_number", "=", "1004")]))
+
+    def test_imported_orders_are_tracked(self):
+        """Imported orders get their creation message and tracking values in the chatter"""
+        self._fetch([self._order("1005")])
+        order = self.ApiProduct.search([("order_number", "=", "1005")])
+        # Tracking values are written when the transaction is about to commit
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+        self.assertTrue(order.message_ids)
+        self.assertIn(
+            "source_id", order.message_ids.tracking_value_ids.field.mapped("name")
+        )
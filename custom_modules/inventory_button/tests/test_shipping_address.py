@@ -0,0 +1,33 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestShippingAddress(TransactionCase):
+    def _parse(self, *lines):
+        return self.env["api.product"]._parse_shipping_address("\n".join(lines))
+
+    def test_address_with_state(self):
+        self.assertEqual(
+            self._parse("John Doe", "Acme", "1 Main St", "Springfield, IL", "62701", "US"),
+            {
+                "ship_country": "US",
+                "ship_postal_code": "62701",
+                "ship_city": "Springfield",
+                "ship_state": "IL",
+            },
+        )
+
+    def test_address_without_state(self):
+        """A city line without a comma can't be told apart from a street"""
+        self.assertEqual(
+            self._parse("Jane Doe", "10 Downing Street", "London", "SW1A 2AA", "GB"),
+            {"ship_country": "GB", "ship_postal_code": "SW1A 2AA"},
+        )
+
+    def test_address_without_postal_code(self):
+        """Without a postal code no line is read as city and state"""
+        self.assertEqual(self._parse("Doe, John", "US"), {"ship_country": "US"})
+
+    def test_street_is_not_a_postal_code(self):
+        self.assertEqual(self._parse("John", "1 Main", "US"), {"ship_country": "US"})
+        self.assertEqual(self._parse("John", "100 Elm"), {})